@@ -0,0 +1,119 @@
+"""
+First-request latency benchmark for the book sharing application.
+
+A new worker compiles each template the first time it renders it, so its
+first requests are slower than the rest. This builds a small database, then
+in fresh interpreters times the first and second request to a few pages,
+logged in as a bench user, with the template bytecode cache off, on but
+empty (the first worker after a deploy that skipped `flask templates
+compile`) and on and precompiled.
+
+Run from the kiro-book directory:
+
+    python -m bench.first_request --runs 5
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# '/books/<id>' is filled in with a public book from the generated database
+PAGES = ('/', '/books/', '/books/<id>', '/profile/')
+
+# Runs in a fresh interpreter, like a newly forked worker
+CHILD = '''
+import json, sys, time
+from src.app import create_app
+db_path, cache, user_id, pages = sys.argv[1], sys.argv[2], sys.argv[3], sys.argv[4:]
+app = create_app(test_config={
+    'SECRET_KEY': 'bench',
+    'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+    'TEMPLATE_BYTECODE_CACHE': cache or False,
+})
+client = app.test_client()
+with client.session_transaction() as session:
+    session['_user_id'] = user_id
+    session['_fresh'] = True
+timings = {}
+for page in pages:
+    runs = []
+    for _ in range(2):
+        started = time.perf_counter()
+        response = client.get(page)
+        runs.append(time.perf_counter() - started)
+        assert response.status_code == 200, (page, response.status_code)
+    timings[page] = runs
+print(json.dumps(timings))
+'''
+
+def measure(runs, db_path, cache, user_id, pages):
+    results = []
+    for _ in range(runs):
+        child = subprocess.run([sys.executable, '-c', CHILD, db_path, cache, str(user_id), *pages.values()],
+                               capture_output=True, text=True)
+        if child.returncode:
+            raise SystemExit(child.stderr)
+        timings = json.loads(child.stdout.strip().splitlines()[-1])
+        results.append({label: timings[path] for label, path in pages.items()})
+    return results
+
+def compile_cache(db_path, cache):
+    """What `flask templates compile` does, against the bench database."""
+    from src.app import create_app
+    from src.template_cache import compile_templates
+    app = create_app(test_config={
+        'SECRET_KEY': 'bench',
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'TEMPLATE_BYTECODE_CACHE': cache,
+    })
+    compile_templates(app)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per mode')
+    args = parser.parse_args()
+
+    from bench.generate import generate
+    workdir = tempfile.mkdtemp(prefix='bench-first-request-')
+    db_path = os.path.join(workdir, 'bench.db')
+    generate(db_path, 1000, echo=lambda message: None)
+    connection = sqlite3.connect(db_path)
+    book_id = connection.execute('SELECT min(book_id) FROM books WHERE is_hidden = 0').fetchone()[0]
+    user_id = connection.execute("SELECT user_id FROM users WHERE email = 'bench0@example.com'").fetchone()[0]
+    connection.close()
+    pages = {page: page.replace('<id>', str(book_id)) for page in PAGES}
+
+    modes = {}
+    modes['no cache'] = measure(args.runs, db_path, '', user_id, pages)
+    empty = os.path.join(workdir, 'empty-cache')
+    modes['cold cache'] = []
+    for _ in range(args.runs):
+        # Empty again for every run: this is the first worker to render
+        if os.path.isdir(empty):
+            for name in os.listdir(empty):
+                os.unlink(os.path.join(empty, name))
+        modes['cold cache'] += measure(1, db_path, empty, user_id, pages)
+    compiled = os.path.join(workdir, 'compiled-cache')
+    compile_cache(db_path, compiled)
+    modes['precompiled'] = measure(args.runs, db_path, compiled, user_id, pages)
+
+    print(f'median of {args.runs} fresh processes, ms: first request (second request)\n')
+    print(f'{"page":<14}' + ''.join(f'{mode:>20}' for mode in modes))
+    for page in PAGES + ('all pages',):
+        cells = []
+        for results in modes.values():
+            if page == 'all pages':
+                first = [sum(result[p][0] for p in PAGES) * 1000 for result in results]
+                second = [sum(result[p][1] for p in PAGES) * 1000 for result in results]
+            else:
+                first = [result[page][0] * 1000 for result in results]
+                second = [result[page][1] * 1000 for result in results]
+            cells.append(f'{statistics.median(first):.1f} ({statistics.median(second):.1f})')
+        print(f'{page:<14}' + ''.join(f'{cell:>20}' for cell in cells))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""
+Synthetic data generator for the book sharing application.
+
+Builds a database of users, books, upvotes, comments, borrow requests and
+borrowing history at a given scale. The same --seed always produces the same
+rows (only the password salt differs), so runs of bench.load against
+databases generated on different machines or releases are comparable.
+
+Every bench user logs in with the email bench{N}@example.com and the
+password in PASSWORD. Rows are written with batched executemany inserts; the
+database triggers keep search, upvote and comment counters and user_stats in
+step exactly as they do for the app.
+
+Run from the kiro-book directory:
+
+    python -m bench.generate --scale 1k --db /tmp/bench-1k.db
+    python -m bench.generate --scale 100k --db /tmp/bench-100k.db
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+# Books per scale; users are a tenth of the books
+SCALES = {'1k': 1000, '10k': 10000, '100k': 100000, '1m': 1000000}
+
+PASSWORD = 'bench-password'
+
+# Generated rows are dated from here, one book per minute
+START = datetime(2024, 1, 1)
+
+WORDS = (
+    'river', 'shadow', 'garden', 'winter', 'empire', 'silent', 'glass', 'harbor', 'letters', 'orchard',
+    'machine', 'forest', 'crown', 'stone', 'summer', 'ember', 'mirror', 'island', 'thread', 'signal',
+    'lantern', 'meadow', 'atlas', 'circuit', 'compass', 'harvest', 'voyage', 'archive', 'echo', 'tide',
+)
+
+def make_app(db_path):
+    from src.app import create_app
+    return create_app(test_config={
+        'SECRET_KEY': 'bench',
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+    })
+
+def phrase(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+def others(rng, user_ids, owner, k):
+    """k distinct users other than owner."""
+    return [u for u in rng.sample(user_ids, min(k + 1, len(user_ids))) if u != owner][:k]
+
+def generate(db_path, books, seed=1, batch_size=5000, echo=print):
+    """Populate a fresh database at db_path with `books` books and related rows."""
+    from src.bootstrap import init_database
+    from src.extensions import db
+    from src.models import Book, BookComment, BookUpvote, BorrowingHistory, BorrowRequest, User
+    from src.passwords import password_hasher
+
+    rng = random.Random(seed)
+    users = max(20, books // 10)
+    app = make_app(db_path)
+    with app.app_context():
+        init_database()
+        # Ids continue after the system user the bootstrap inserted
+        first_user = (db.session.scalar(db.select(db.func.max(User.user_id))) or 0) + 1
+        first_book = (db.session.scalar(db.select(db.func.max(Book.book_id))) or 0) + 1
+        user_ids = range(first_user, first_user + users)
+        password_hash = password_hasher().hash(PASSWORD)
+
+        started = time.perf_counter()
+        for offset in range(0, users, batch_size):
+            db.session.execute(db.insert(User.__table__), [
+                {
+                    'user_id': first_user + n,
+                    'email': f'bench{n}@example.com',
+                    'password_hash': password_hash,
+                    'alias': f'reader{n}',
+                    'bio': phrase(rng, 8) if rng.random() < 0.5 else None,
+                    'registration_date': START - timedelta(days=rng.randrange(365)),
+                    'invite_code_used': 'INITIAL',
+                    'personal_invite_code': f'BENCH{n:08d}',
+                    'invites_used_count': 0,
+                    'is_active': True,
+                }
+                for n in range(offset, min(users, offset + batch_size))
+            ])
+            db.session.commit()
+        echo(f'{users} users')
+
+        counts = {'upvotes': 0, 'comments': 0, 'requests': 0, 'loans': 0}
+        for offset in range(0, books, batch_size):
+            book_rows, upvotes, comments, requests, loans = [], [], [], [], []
+            for n in range(offset, min(books, offset + batch_size)):
+                book_id = first_book + n
+                owner = rng.choice(user_ids)
+                created = START + timedelta(minutes=n)
+
+                voters = others(rng, user_ids, owner, int(rng.expovariate(1 / 3)))
+                upvotes += [{'book_id': book_id, 'user_id': u, 'created_at': created} for u in voters]
+
+                for _ in range(int(rng.expovariate(1 / 2))):
+                    comments.append({'book_id': book_id, 'user_id': rng.choice(user_ids),
+                                     'comment_text': phrase(rng, 12), 'created_at': created + timedelta(hours=rng.randrange(1, 72))})
+
+                # Past loans, then maybe one still open
+                for borrower in others(rng, user_ids, owner, int(rng.expovariate(2))):
+                    borrowed = created + timedelta(days=rng.randrange(1, 60))
+                    loans.append({'book_id': book_id, 'borrower_id': borrower, 'borrow_date': borrowed,
+                                  'return_date': borrowed + timedelta(days=rng.randrange(1, 30))})
+                borrower = None
+                if rng.random() < 0.1:
+                    borrower = others(rng, user_ids, owner, 1)[0]
+                    loans.append({'book_id': book_id, 'borrower_id': borrower,
+                                  'borrow_date': created + timedelta(days=90), 'return_date': None})
+                elif rng.random() < 0.1:
+                    for requester in others(rng, user_ids, owner, rng.randint(1, 3)):
+                        requests.append({'book_id': book_id, 'requester_id': requester, 'status': 'pending',
+                                         'created_at': created, 'updated_at': created})
+
+                book_rows.append({
+                    'book_id': book_id,
+                    'owner_id': owner,
+                    'title': phrase(rng, rng.randint(1, 4)).title(),
+                    'author': f'{rng.choice(WORDS).title()} {rng.choice(WORDS).title()}',
+                    'isbn': f'978{rng.randrange(10 ** 10):010d}' if rng.random() < 0.7 else None,
+                    'purchase_url': None,
+                    'recommendation_rating': rng.randint(1, 5),
+                    'is_available': borrower is None,
+                    'is_hidden': rng.random() < 0.05,
+                    'is_fiction': rng.random() < 0.6,
+                    'current_borrower_id': borrower,
+                    'upvote_count': len(voters),
+                    'created_at': created,
+                    'updated_at': created,
+                })
+
+            db.session.execute(db.insert(Book.__table__), book_rows)
+            for model, rows in ((BookUpvote, upvotes), (BookComment, comments),
+                                (BorrowRequest, requests), (BorrowingHistory, loans)):
+                if rows:
+                    db.session.execute(db.insert(model.__table__), rows)
+            db.session.commit()
+            counts['upvotes'] += len(upvotes)
+            counts['comments'] += len(comments)
+            counts['requests'] += len(requests)
+            counts['loans'] += len(loans)
+            done = min(books, offset + batch_size)
+            if done % (batch_size * 20) == 0 or done == books:
+                echo(f'{done} books ({time.perf_counter() - started:.0f}s)')
+
+        echo(', '.join(f'{count} {name}' for name, count in counts.items()))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', default='1k', help=f'one of {", ".join(SCALES)} or a number of books')
+    parser.add_argument('--db', required=True, help='SQLite file to create')
+    parser.add_argument('--seed', type=int, default=1, help='random seed')
+    parser.add_argument('--force', action='store_true', help='replace an existing database')
+    args = parser.parse_args()
+
+    books = SCALES.get(args.scale.lower()) or int(args.scale)
+    if os.path.exists(args.db):
+        if not args.force:
+            raise SystemExit(f'{args.db} exists; pass --force to replace it')
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(args.db + suffix):
+                os.unlink(args.db + suffix)
+    generate(args.db, books, seed=args.seed)
+
+if __name__ == '__main__':
+    main()
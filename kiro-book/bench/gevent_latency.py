@@ -0,0 +1,168 @@
+"""
+Gevent hub-blocking benchmark for the book sharing application.
+
+Serves the app from a monkey-patched gevent WSGI server (what one gunicorn
+gevent worker does) and measures the latency of a cheap route on its own and
+while a slow query route is kept busy, with statement execution on the hub
+(DB_THREADPOOL_SIZE = 0) and on the native thread pool.
+
+Run from the kiro-book directory:
+
+    python -m bench.gevent_latency --duration 10
+"""
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Rows the slow route counts through; about half a second of SQLite work
+SLOW_QUERY_ROWS = 3000000
+
+def serve(db_path, port, pool_size):
+    """Child process: a single gevent worker with an extra slow route."""
+    from gevent import monkey
+    monkey.patch_all()
+    from gevent.pywsgi import WSGIServer
+
+    from src.app import create_app
+    from src.extensions import db
+
+    app = create_app(test_config={
+        'SECRET_KEY': 'bench',
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'DB_THREADPOOL_SIZE': pool_size,
+    })
+
+    def slow():
+        count = db.session.execute(db.text(
+            'WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < :rows) '
+            'SELECT count(*) FROM n'
+        ), {'rows': SLOW_QUERY_ROWS}).scalar()
+        return str(count)
+    app.add_url_rule('/_bench/slow', 'bench_slow', slow)
+
+    WSGIServer(('127.0.0.1', port), app, log=None).serve_forever()
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def get(port, path):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        connection.request('GET', path)
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    finally:
+        connection.close()
+
+def wait_until_ready(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            get(port, '/')
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit('benchmark server did not start')
+
+def measure(port, path, duration, clients):
+    """Hit path from several client threads for duration seconds; return sorted latencies."""
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client():
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            get(port, path)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(latencies)
+
+def keep_busy(port, path, stop):
+    while not stop.is_set():
+        get(port, path)
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+def run(db_path, pool_size, args):
+    port = free_port()
+    server = subprocess.Popen([sys.executable, '-m', 'bench.gevent_latency', '--serve',
+                               '--db', db_path, '--port', str(port), '--pool-size', str(pool_size)])
+    try:
+        wait_until_ready(port)
+        rows = []
+        for slow_clients in (0, args.slow_clients):
+            stop = threading.Event()
+            busy = [threading.Thread(target=keep_busy, args=(port, '/_bench/slow', stop))
+                    for _ in range(slow_clients)]
+            for thread in busy:
+                thread.start()
+            latencies = measure(port, '/', args.duration, args.clients)
+            stop.set()
+            for thread in busy:
+                thread.join()
+            rows.append((slow_clients, latencies))
+        return rows
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per measurement')
+    parser.add_argument('--clients', type=int, default=4, help='client threads on the cheap route')
+    parser.add_argument('--slow-clients', type=int, default=1, help='client threads on the slow route')
+    parser.add_argument('--pool-size', type=int, default=4, help='DB_THREADPOOL_SIZE for the pooled run')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.db, args.port, args.pool_size)
+        return
+
+    fd, db_path = tempfile.mkstemp(prefix='bench-gevent-', suffix='.db')
+    os.close(fd)
+    os.unlink(db_path)
+    try:
+        from src.app import create_app
+        from src.bootstrap import init_database
+        # Create the schema once so the server processes start on a ready database
+        with create_app(test_config={'SECRET_KEY': 'bench', 'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}'}).app_context():
+            init_database()
+
+        print(f'GET / from {args.clients} client(s), {args.duration:g}s per row\n')
+        print(f'{"execution":<14}{"slow route":>11}{"requests":>10}{"p50 ms":>9}{"p99 ms":>9}{"max ms":>9}')
+        for label, pool_size in (('on hub', 0), (f'pool of {args.pool_size}', args.pool_size)):
+            for slow_clients, latencies in run(db_path, pool_size, args):
+                print(f'{label:<14}{"busy" if slow_clients else "idle":>11}{len(latencies):>10}'
+                      f'{percentile(latencies, 0.50) * 1000:>9.1f}'
+                      f'{percentile(latencies, 0.99) * 1000:>9.1f}'
+                      f'{(latencies[-1] if latencies else 0) * 1000:>9.1f}')
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.unlink(db_path + suffix)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Load driver for the book sharing application.
+
+Serves a database made by bench.generate with gunicorn gevent workers (the
+production setup) and runs virtual users against it. Each virtual user logs
+in as its own bench user and then loops over a weighted mix of the hot
+routes: dashboard, book page, upvote toggle and borrow request. Latencies
+after the warm-up are reported per route by bench.report; --save keeps the
+numbers and --baseline compares them with a saved run and exits non-zero on
+a regression.
+
+Run from the kiro-book directory:
+
+    python -m bench.generate --scale 100k --db /tmp/bench-100k.db
+    python -m bench.load --db /tmp/bench-100k.db --users 20 --duration 60 --save baseline.json
+    python -m bench.load --db /tmp/bench-100k.db --users 20 --duration 60 --baseline baseline.json
+"""
+import argparse
+import http.client
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+
+from bench.gevent_latency import free_port, wait_until_ready
+from bench.generate import PASSWORD
+from bench import report
+
+# Route label -> share of a virtual user's requests
+MIX = {
+    'GET /': 40,
+    'GET /books/<id>': 35,
+    'POST /books/<id>/upvote': 15,
+    'POST /books/<id>/borrow': 10,
+}
+
+def bench_app():
+    """Gunicorn app factory: the app over BENCH_DB with CSRF off so virtual users can post forms."""
+    from src.app import create_app
+    return create_app(test_config={
+        'SECRET_KEY': 'bench',
+        'WTF_CSRF_ENABLED': False,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.environ["BENCH_DB"]}',
+    })
+
+class VirtualUser:
+    """One logged-in browser: a keep-alive connection and its cookies."""
+
+    def __init__(self, port):
+        self.port = port
+        self.cookies = SimpleCookie()
+        self.connection = None
+
+    def request(self, method, path, form=None, headers=None):
+        headers = dict(headers or {})
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{name}={morsel.value}' for name, morsel in self.cookies.items())
+        body = None
+        if form is not None:
+            body = urlencode(form)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        try:
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+            self.connection.request(method, path, body, headers)
+            response = self.connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = None
+            raise
+        for header in response.headers.get_all('Set-Cookie') or ():
+            self.cookies.load(header)
+        return response.status
+
+    def log_in(self, email):
+        status = self.request('POST', '/auth/login', {'email': email, 'password': PASSWORD})
+        if status != 302:
+            raise RuntimeError(f'login as {email} answered {status}')
+
+def drive(port, user_number, book_ids, seed, warmup_until, deadline, samples):
+    """Virtual user loop: append (route, seconds, ok) samples taken after warm-up."""
+    rng = random.Random(seed)
+    user = VirtualUser(port)
+    user.log_in(f'bench{user_number}@example.com')
+    routes, weights = list(MIX), list(MIX.values())
+    while time.monotonic() < deadline:
+        route = rng.choices(routes, weights)[0]
+        book_id = rng.choice(book_ids)
+        start = time.perf_counter()
+        try:
+            if route == 'GET /':
+                status = user.request('GET', '/')
+            elif route == 'GET /books/<id>':
+                status = user.request('GET', f'/books/{book_id}')
+            elif route == 'POST /books/<id>/upvote':
+                status = user.request('POST', f'/books/{book_id}/upvote',
+                                      headers={'X-Requested-With': 'XMLHttpRequest'})
+            else:
+                status = user.request('POST', f'/books/{book_id}/borrow', {})
+            ok = status < 400
+        except (OSError, http.client.HTTPException):
+            ok = False
+        elapsed = time.perf_counter() - start
+        if time.monotonic() >= warmup_until:
+            samples.append((route, elapsed, ok))
+
+def run(args):
+    connection = sqlite3.connect(args.db)
+    try:
+        book_ids = [row[0] for row in connection.execute('SELECT book_id FROM books WHERE is_hidden = 0')]
+        bench_users = connection.execute("SELECT count(*) FROM users WHERE email LIKE 'bench%'").fetchone()[0]
+    finally:
+        connection.close()
+    if not book_ids or bench_users < args.users:
+        raise SystemExit(f'{args.db} needs at least {args.users} bench users; create it with bench.generate')
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--worker-class', 'gevent', '--workers', str(args.workers),
+         '--bind', f'127.0.0.1:{port}', '--log-level', 'warning', 'bench.load:bench_app()'],
+        env={**os.environ, 'BENCH_DB': os.path.abspath(args.db)}
+    )
+    try:
+        wait_until_ready(port)
+        samples = []
+        start = time.monotonic()
+        warmup_until = start + args.warmup
+        deadline = warmup_until + args.duration
+        threads = [
+            threading.Thread(target=drive, args=(port, n, book_ids, args.seed + n, warmup_until, deadline, samples))
+            for n in range(args.users)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return samples
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', required=True, help='database made by bench.generate')
+    parser.add_argument('--users', type=int, default=20, help='concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=30.0, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=5.0, help='unmeasured seconds first')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn gevent workers')
+    parser.add_argument('--seed', type=int, default=1, help='random seed for the virtual users')
+    parser.add_argument('--save', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', help='JSON of an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=report.DEFAULT_THRESHOLD, help='allowed slowdown, e.g. 0.2')
+    args = parser.parse_args()
+
+    samples = run(args)
+    summary = report.summarize(samples, args.duration)
+    print(f'{args.users} virtual users, {args.workers} gevent workers, {args.duration:g}s after {args.warmup:g}s warm-up\n')
+    found = report.print_report(summary, report.load(args.baseline) if args.baseline else None, args.threshold)
+    if args.save:
+        report.save(args.save, summary, {
+            'db': os.path.basename(args.db), 'users': args.users, 'workers': args.workers,
+            'duration': args.duration, 'seed': args.seed,
+        })
+    if found:
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
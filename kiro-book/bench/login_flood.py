@@ -0,0 +1,143 @@
+"""
+Login flood benchmark for the book sharing application.
+
+Serves the app from one monkey-patched gevent worker and measures dashboard
+(GET /) latency on its own and while clients keep logging in, with password
+hashing in the request (PASSWORD_HASH_WORKERS = 0) and on the process pool.
+
+Run from the kiro-book directory:
+
+    python -m bench.login_flood --duration 10 --login-clients 4
+"""
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from urllib.parse import urlencode
+
+from bench.gevent_latency import free_port, measure, percentile, wait_until_ready
+
+USERS = 20
+PASSWORD = 'bench-password'
+
+def serve(db_path, port, workers):
+    """Child process: a single gevent worker."""
+    from gevent import monkey
+    monkey.patch_all()
+    import signal
+
+    import gevent
+    from gevent.pywsgi import WSGIServer
+
+    from src.app import create_app
+
+    app = create_app(test_config={
+        'SECRET_KEY': 'bench',
+        'WTF_CSRF_ENABLED': False,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'PASSWORD_HASH_WORKERS': workers,
+    })
+    server = WSGIServer(('127.0.0.1', port), app, log=None)
+    # Exit normally on terminate so the hashing pool is shut down too
+    gevent.signal_handler(signal.SIGTERM, server.stop)
+    server.serve_forever()
+    app.extensions['password_hasher'].shutdown()
+
+def seed(db_path):
+    from src.app import create_app
+    from src.bootstrap import init_database
+    from src.extensions import db
+    from src.models import User
+
+    app = create_app(test_config={'SECRET_KEY': 'bench', 'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}'})
+    with app.app_context():
+        init_database()
+        db.session.add_all(
+            User(email=f'flood{i}@example.com', password=PASSWORD, alias=f'flood{i}', invite_code_used='INITIAL')
+            for i in range(USERS)
+        )
+        db.session.commit()
+
+def log_in(port, user):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        connection.request('POST', '/auth/login',
+                           urlencode({'email': f'flood{user}@example.com', 'password': PASSWORD}),
+                           {'Content-Type': 'application/x-www-form-urlencoded'})
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    finally:
+        connection.close()
+
+def flood(port, stop, offset, logins):
+    user = offset
+    while not stop.is_set():
+        log_in(port, user % USERS)
+        logins.append(1)
+        user += 1
+
+def run(db_path, workers, args):
+    port = free_port()
+    server = subprocess.Popen([sys.executable, '-m', 'bench.login_flood', '--serve',
+                               '--db', db_path, '--port', str(port), '--workers', str(workers)])
+    try:
+        wait_until_ready(port)
+        # Warm up: the first login starts the hashing pool
+        log_in(port, 0)
+        rows = []
+        for login_clients in (0, args.login_clients):
+            stop = threading.Event()
+            logins = []
+            flooders = [threading.Thread(target=flood, args=(port, stop, i, logins)) for i in range(login_clients)]
+            for thread in flooders:
+                thread.start()
+            latencies = measure(port, '/', args.duration, args.clients)
+            stop.set()
+            for thread in flooders:
+                thread.join()
+            rows.append((login_clients, len(logins), latencies))
+        return rows
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per measurement')
+    parser.add_argument('--clients', type=int, default=4, help='client threads on the dashboard')
+    parser.add_argument('--login-clients', type=int, default=4, help='client threads logging in')
+    parser.add_argument('--workers', type=int, default=2, help='PASSWORD_HASH_WORKERS for the pooled run')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.db, args.port, args.workers)
+        return
+
+    fd, db_path = tempfile.mkstemp(prefix='bench-logins-', suffix='.db')
+    os.close(fd)
+    os.unlink(db_path)
+    try:
+        seed(db_path)
+        print(f'GET / from {args.clients} client(s), {args.duration:g}s per row\n')
+        print(f'{"hashing":<14}{"login clients":>14}{"logins":>8}{"requests":>10}'
+              f'{"p50 ms":>9}{"p99 ms":>9}{"max ms":>9}')
+        for label, workers in (('in request', 0), (f'pool of {args.workers}', args.workers)):
+            for login_clients, logins, latencies in run(db_path, workers, args):
+                print(f'{label:<14}{login_clients:>14}{logins:>8}{len(latencies):>10}'
+                      f'{percentile(latencies, 0.50) * 1000:>9.1f}'
+                      f'{percentile(latencies, 0.99) * 1000:>9.1f}'
+                      f'{(latencies[-1] if latencies else 0) * 1000:>9.1f}')
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.unlink(db_path + suffix)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Load test report for the book sharing application.
+
+Turns the samples a bench.load run collected into per-route request counts,
+errors, p50/p95/p99 latency and throughput, prints them as a table, saves
+them as JSON and compares them with a saved baseline so a release that got
+slower is caught before it ships.
+
+Compare two saved runs from the kiro-book directory:
+
+    python -m bench.report results.json --baseline baseline.json
+"""
+import argparse
+import json
+
+from bench.gevent_latency import percentile
+
+# A route regresses if its p95 grows, or its throughput drops, by more than this
+DEFAULT_THRESHOLD = 0.2
+
+def summarize(samples, duration):
+    """samples: (route, seconds, ok) tuples. Returns {route: stats} with times in ms."""
+    latencies, errors = {}, {}
+    for route, seconds, ok in samples:
+        latencies.setdefault(route, []).append(seconds)
+        errors[route] = errors.get(route, 0) + (not ok)
+    summary = {}
+    for route in sorted(latencies):
+        times = sorted(latencies[route])
+        summary[route] = {
+            'requests': len(times),
+            'errors': errors[route],
+            'p50': round(percentile(times, 0.50) * 1000, 1),
+            'p95': round(percentile(times, 0.95) * 1000, 1),
+            'p99': round(percentile(times, 0.99) * 1000, 1),
+            'rps': round(len(times) / duration, 1),
+        }
+    return summary
+
+def regressions(summary, baseline, threshold=DEFAULT_THRESHOLD):
+    """Routes whose p95 or throughput is more than threshold worse than in baseline."""
+    found = {}
+    for route, stats in summary.items():
+        before = baseline.get(route)
+        if before is None:
+            continue
+        reasons = []
+        if before['p95'] and stats['p95'] > before['p95'] * (1 + threshold):
+            reasons.append(f'p95 {before["p95"]} -> {stats["p95"]} ms')
+        if before['rps'] and stats['rps'] < before['rps'] * (1 - threshold):
+            reasons.append(f'rps {before["rps"]} -> {stats["rps"]}')
+        if stats['errors'] > before['errors']:
+            reasons.append(f'errors {before["errors"]} -> {stats["errors"]}')
+        if reasons:
+            found[route] = reasons
+    return found
+
+def print_report(summary, baseline=None, threshold=DEFAULT_THRESHOLD):
+    """Print the per-route table, then any regressions against baseline; returns the regressions."""
+    print(f'{"route":<28}{"requests":>10}{"errors":>8}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"req/s":>8}')
+    for route, stats in summary.items():
+        print(f'{route:<28}{stats["requests"]:>10}{stats["errors"]:>8}'
+              f'{stats["p50"]:>9.1f}{stats["p95"]:>9.1f}{stats["p99"]:>9.1f}{stats["rps"]:>8.1f}')
+
+    if baseline is None:
+        return {}
+    found = regressions(summary, baseline, threshold)
+    print()
+    if found:
+        print(f'Regressions against the baseline (threshold {threshold:.0%}):')
+        for route, reasons in found.items():
+            print(f'  {route}: {"; ".join(reasons)}')
+    else:
+        print(f'No regressions against the baseline (threshold {threshold:.0%}).')
+    return found
+
+def save(path, summary, settings):
+    with open(path, 'w') as file:
+        json.dump({'settings': settings, 'routes': summary}, file, indent=2)
+
+def load(path):
+    with open(path) as file:
+        return json.load(file)['routes']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('results', help='JSON saved by bench.load --save')
+    parser.add_argument('--baseline', help='JSON of an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='allowed slowdown, e.g. 0.2')
+    args = parser.parse_args()
+
+    found = print_report(load(args.results), load(args.baseline) if args.baseline else None, args.threshold)
+    if found:
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
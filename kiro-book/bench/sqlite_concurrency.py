@@ -0,0 +1,198 @@
+"""
+SQLite concurrency benchmark for the book sharing application.
+
+Runs the same mixed workload (upvote toggles, comments and page reads, one
+process per simulated gunicorn worker) against a fresh database twice: once with SQLite's
+default settings and once with the engine profile from src/sqlite_tuning.py.
+It reports the write error rate ("database is locked" and friends), overall
+and per write route, and read latency for each. Commenting reads the book
+before inserting, so it catches read-then-write transactions that fail
+when another worker commits in between.
+
+Run from the kiro-book directory:
+
+    python -m bench.sqlite_concurrency --processes 8 --duration 10
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from src.sqlite_tuning import DEFAULT_PRAGMAS
+
+PROFILES = {
+    # SQLite's own defaults and pysqlite's deferred transactions
+    'default': {'SQLITE_PRAGMAS': {name: None for name in DEFAULT_PRAGMAS}, 'SQLITE_IMMEDIATE_WRITES': False},
+    'tuned': {},
+}
+
+def make_app(db_path, profile):
+    from src.app import create_app
+    config = {
+        'TESTING': True,
+        'WTF_CSRF_ENABLED': False,
+        'SECRET_KEY': 'bench',
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+    }
+    config.update(PROFILES[profile])
+    return create_app(test_config=config)
+
+def seed(app, users, books):
+    """Insert users and books in bulk, sharing one password hash."""
+    from werkzeug.security import generate_password_hash
+    from src.bootstrap import init_database
+    from src.extensions import db
+    from src.models import Book, User
+
+    password_hash = generate_password_hash('password123')
+    now = datetime.utcnow()
+    with app.app_context():
+        init_database()
+        db.session.execute(db.insert(User), [
+            {
+                'email': f'bench{i}@example.com', 'password_hash': password_hash, 'alias': f'bench{i}',
+                'registration_date': now, 'invite_code_used': 'INITIAL',
+                'personal_invite_code': f'BENCH{i:05d}', 'invites_used_count': 0, 'is_active': True,
+            }
+            for i in range(users)
+        ])
+        user_ids = db.session.scalars(db.select(User.user_id).where(User.email.like('bench%'))).all()
+        db.session.execute(db.insert(Book), [
+            {
+                'owner_id': user_ids[i % len(user_ids)], 'title': f'Benchmark Book {i}', 'author': f'Author {i % 500}',
+                'recommendation_rating': i % 5 + 1, 'is_available': True, 'is_hidden': False,
+                'is_fiction': i % 2 == 0, 'upvote_count': 0,
+                'created_at': now - timedelta(minutes=i), 'updated_at': now - timedelta(minutes=i),
+            }
+            for i in range(books)
+        ])
+        db.session.commit()
+        return user_ids
+
+def toggle_upvote(client, book_id, rng):
+    return client.post(f'/books/{book_id}/upvote', headers={'X-Requested-With': 'XMLHttpRequest'})
+
+def add_comment(client, book_id, rng):
+    return client.post(f'/books/{book_id}/comment', data={'comment_text': f'Benchmark comment {rng.random()}'})
+
+# Write requests, picked at random in equal shares
+WRITE_ROUTES = {
+    'upvote': toggle_upvote,
+    'comment': add_comment,
+}
+
+def worker(db_path, profile, user_id, books, duration, write_ratio, seed_value, results):
+    """One simulated gunicorn worker: upvote and comment as user_id and read pages until time runs out."""
+    try:
+        app = make_app(db_path, profile)
+    except Exception as exc:
+        # Report instead of dying, or the parent would wait for this worker forever
+        results.put(f'{type(exc).__name__}: {exc}')
+        return
+    writer = app.test_client()
+    with writer.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    reader = app.test_client()
+    rng = random.Random(seed_value)
+
+    writes = {name: 0 for name in WRITE_ROUTES}
+    write_errors = {name: 0 for name in WRITE_ROUTES}
+    read_latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        book_id = rng.randint(1, books)
+        if rng.random() < write_ratio:
+            name = rng.choice(tuple(WRITE_ROUTES))
+            writes[name] += 1
+            try:
+                response = WRITE_ROUTES[name](writer, book_id, rng)
+                write_errors[name] += response.status_code >= 500
+            except Exception:
+                write_errors[name] += 1
+        else:
+            url = rng.choice(('/', f'/books/{book_id}'))
+            start = time.perf_counter()
+            try:
+                reader.get(url)
+            except Exception:
+                pass
+            read_latencies.append(time.perf_counter() - start)
+    results.put((writes, write_errors, read_latencies))
+
+def run(profile, args):
+    fd, db_path = tempfile.mkstemp(prefix=f'bench-{profile}-', suffix='.db')
+    os.close(fd)
+    os.unlink(db_path)
+    try:
+        user_ids = seed(make_app(db_path, profile), args.processes, args.books)
+
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        processes = [
+            context.Process(target=worker, args=(
+                db_path, profile, user_ids[i], args.books, args.duration, args.write_ratio, i, results))
+            for i in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        outcomes = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        failures = [outcome for outcome in outcomes if isinstance(outcome, str)]
+        if failures:
+            raise SystemExit(f'{len(failures)} worker(s) failed to start: {failures[0]}')
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.unlink(db_path + suffix)
+
+    writes = {name: sum(outcome[0][name] for outcome in outcomes) for name in WRITE_ROUTES}
+    write_errors = {name: sum(outcome[1][name] for outcome in outcomes) for name in WRITE_ROUTES}
+    latencies = sorted(latency for outcome in outcomes for latency in outcome[2])
+    return {
+        'writes': writes,
+        'write_errors': write_errors,
+        'reads': len(latencies),
+        'latencies': latencies,
+    }
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', type=int, default=8, help='concurrent worker processes')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per profile')
+    parser.add_argument('--books', type=int, default=2000, help='books to seed')
+    parser.add_argument('--write-ratio', type=float, default=0.3, help='share of requests that upvote or comment')
+    parser.add_argument('--profile', choices=sorted(PROFILES), action='append',
+                        help='profile(s) to run (default: all)')
+    args = parser.parse_args()
+
+    print(f'{args.processes} processes, {args.duration:g}s each, {args.books} books, '
+          f'{args.write_ratio:.0%} writes\n')
+    print(f'{"profile":<10}{"writes":>8}{"errors":>8}{"error %":>9}{"reads":>8}'
+          f'{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"req/s":>9}')
+    for profile in args.profile or PROFILES:
+        result = run(profile, args)
+        latencies = result['latencies']
+        writes, write_errors = sum(result['writes'].values()), sum(result['write_errors'].values())
+        error_rate = write_errors / writes if writes else 0.0
+        throughput = (writes + result['reads']) / args.duration
+        print(f'{profile:<10}{writes:>8}{write_errors:>8}{error_rate:>9.1%}'
+              f'{result["reads"]:>8}'
+              f'{percentile(latencies, 0.50) * 1000:>9.1f}'
+              f'{percentile(latencies, 0.95) * 1000:>9.1f}'
+              f'{percentile(latencies, 0.99) * 1000:>9.1f}'
+              f'{throughput:>9.0f}')
+        for name in WRITE_ROUTES:
+            print(f'  {name:<8}{result["writes"][name]:>8}{result["write_errors"][name]:>8}')
+
+if __name__ == '__main__':
+    main()
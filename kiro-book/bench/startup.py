@@ -0,0 +1,76 @@
+"""
+Startup time benchmark for the book sharing application.
+
+Every gunicorn worker recycled by max_requests (and every `flask` command)
+pays for importing the app and running create_app, so both are timed here in
+fresh interpreters: cold import of src.app, then create_app, the way a server
+worker builds the app and the way the `flask` command does (which also sets up
+Flask-Migrate and the CLI commands). Each run also checks that building the
+app left the database file untouched.
+
+Run from the kiro-book directory:
+
+    python -m bench.startup --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Runs in a fresh interpreter so nothing is imported yet
+CHILD = '''
+import json, os, sys, time
+db_path = sys.argv[1]
+started = time.perf_counter()
+import src.app
+imported = time.perf_counter()
+app = src.app.create_app(test_config={'SECRET_KEY': 'bench', 'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}'})
+created = time.perf_counter()
+print(json.dumps({
+    'import': imported - started,
+    'create_app': created - imported,
+    'modules': len(sys.modules),
+    'touched_db': os.path.exists(db_path),
+}))
+'''
+
+MODES = {
+    'server worker': {},
+    'flask command': {'FLASK_RUN_FROM_CLI': 'true'},
+}
+
+def measure(runs, extra_env, db_path):
+    env = {key: value for key, value in os.environ.items() if key != 'FLASK_RUN_FROM_CLI'}
+    env.update(extra_env)
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', CHILD, db_path], env=env,
+                                capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10, help='fresh interpreters per mode')
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='bench-startup-'), 'untouched.db')
+    print(f'median (min) of {args.runs} cold starts\n')
+    print(f'{"mode":<16}{"import ms":>16}{"create_app ms":>18}{"total ms":>16}{"modules":>9}{"db touched":>12}')
+    for label, extra_env in MODES.items():
+        results = measure(args.runs, extra_env, db_path)
+        columns = []
+        for key in ('import', 'create_app'):
+            times = [result[key] * 1000 for result in results]
+            columns.append(f'{statistics.median(times):.0f} ({min(times):.0f})')
+        totals = [(result['import'] + result['create_app']) * 1000 for result in results]
+        columns.append(f'{statistics.median(totals):.0f} ({min(totals):.0f})')
+        touched = any(result['touched_db'] for result in results)
+        print(f'{label:<16}{columns[0]:>16}{columns[1]:>18}{columns[2]:>16}'
+              f'{results[-1]["modules"]:>9}{"yes" if touched else "no":>12}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Upvote toggle stress test for the book sharing application.
+
+Several processes hammer POST /books/<id>/upvote at the same time: all of
+them as one shared user on one book (a double click taken to the extreme)
+and each as its own user on a second book. Afterwards it checks that no
+request failed, that every book's upvote_count matches its book_upvotes
+rows, and that the shared user's upvote is present exactly when the number
+of toggles was odd. With --queue the same run goes through the upvote
+journal (UPVOTE_QUEUE) and is checked after the journal is flushed.
+
+Run from the kiro-book directory:
+
+    python -m bench.upvote_stress --processes 8 --toggles 200 [--queue]
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+
+def make_app(db_path, queue=False):
+    from src.app import create_app
+    return create_app(test_config={
+        'TESTING': True,
+        'WTF_CSRF_ENABLED': False,
+        'SECRET_KEY': 'bench',
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'UPVOTE_QUEUE': queue,
+    })
+
+def seed(app, users):
+    from src.bootstrap import init_database
+    from src.extensions import db
+    from src.models import Book, User
+
+    with app.app_context():
+        init_database()
+        accounts = [
+            User(email=f'stress{i}@example.com', password='password123', alias=f'stress{i}', invite_code_used='INITIAL')
+            for i in range(users)
+        ]
+        db.session.add_all(accounts)
+        db.session.commit()
+        books = [Book(accounts[0].user_id, f'Stress Book {i}', 'Author', 3) for i in range(2)]
+        db.session.add_all(books)
+        db.session.commit()
+        return [account.user_id for account in accounts], [book.book_id for book in books]
+
+def worker(db_path, queue, shared_user, own_user, shared_book, own_book, toggles, results):
+    """Alternate toggles as the shared user and as this process's own user."""
+    try:
+        app = make_app(db_path, queue)
+    except Exception as exc:
+        results.put(f'{type(exc).__name__}: {exc}')
+        return
+
+    clients = {}
+    for user_id in (shared_user, own_user):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+            session['_fresh'] = True
+        clients[user_id] = client
+
+    counts = {shared_book: 0, own_book: 0}
+    errors = []
+    for i in range(toggles):
+        user_id, book_id = (shared_user, shared_book) if i % 2 == 0 else (own_user, own_book)
+        try:
+            response = clients[user_id].post(f'/books/{book_id}/upvote', headers={'X-Requested-With': 'XMLHttpRequest'})
+            if response.status_code == 200:
+                counts[book_id] += 1
+            else:
+                errors.append(f'HTTP {response.status_code}')
+        except Exception as exc:
+            errors.append(f'{type(exc).__name__}: {exc}')
+    results.put((counts[shared_book], counts[own_book], errors))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', type=int, default=8, help='concurrent processes')
+    parser.add_argument('--toggles', type=int, default=200, help='toggles per process')
+    parser.add_argument('--queue', action='store_true', help='toggle through the upvote journal')
+    args = parser.parse_args()
+
+    fd, db_path = tempfile.mkstemp(prefix='bench-upvotes-', suffix='.db')
+    os.close(fd)
+    os.unlink(db_path)
+    try:
+        app = make_app(db_path, args.queue)
+        user_ids, (shared_book, own_book) = seed(app, args.processes)
+
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        processes = [
+            context.Process(target=worker, args=(
+                db_path, args.queue, user_ids[0], user_ids[i], shared_book, own_book, args.toggles, results))
+            for i in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        outcomes = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+        failures = [outcome for outcome in outcomes if isinstance(outcome, str)]
+        if failures:
+            raise SystemExit(f'{len(failures)} worker(s) failed to start: {failures[0]}')
+
+        shared_toggles = sum(outcome[0] for outcome in outcomes)
+        errors = [error for outcome in outcomes for error in outcome[2]]
+
+        from src.extensions import db
+        from src.models import Book, BookUpvote
+        with app.app_context():
+            if args.queue:
+                # Apply whatever the workers' flushers hadn't got to yet
+                app.extensions['upvote_queue'].flush()
+            drifted = db.session.execute(
+                db.select(Book.book_id, Book.upvote_count, db.func.count(BookUpvote.upvote_id))
+                .outerjoin(BookUpvote, BookUpvote.book_id == Book.book_id)
+                .group_by(Book.book_id)
+                .having(Book.upvote_count != db.func.count(BookUpvote.upvote_id))
+            ).all()
+            shared_upvoted = db.session.scalar(
+                db.select(db.func.count()).select_from(BookUpvote)
+                .where(BookUpvote.book_id == shared_book, BookUpvote.user_id == user_ids[0])
+            ) == 1
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.unlink(db_path + suffix)
+
+    print(f'{args.processes} processes x {args.toggles} toggles' + (' through the upvote queue' if args.queue else ''))
+    print(f'failed requests:          {len(errors)}' + (f' (first: {errors[0]})' if errors else ''))
+    print(f'shared user toggles:      {shared_toggles} -> upvoted={shared_upvoted}')
+    print(f'books with drifted count: {len(drifted)}')
+
+    if errors or drifted or shared_upvoted != (shared_toggles % 2 == 1):
+        print('FAILED')
+        raise SystemExit(1)
+    print('OK')
+
+if __name__ == '__main__':
+    main()
@@ -37,3 +37,28 @@ max_requests_jitter = 50
 
 # Graceful timeout
 graceful_timeout = 30
+
+def post_fork(server, worker):
+    """Drop any database connections the preloaded app opened in the master, so
+    workers never share a SQLite connection across fork."""
+    from wsgi import application
+    from src.extensions import db
+    with application.app_context():
+        db.engine.dispose(close=False)
+
+def worker_exit(server, worker):
+    """Log the worker's book card cache statistics, apply its queued upvotes and stop its
+    password hashing processes when it exits or is recycled."""
+    from wsgi import application
+    cache = application.extensions.get('card_cache')
+    if cache is not None:
+        server.log.info('Worker %s card cache: %s', worker.pid, cache.stats())
+    
+    queue = application.extensions.get('upvote_queue')
+    if queue is not None:
+        with application.app_context():
+            queue.flush()
+    
+    hasher = application.extensions.get('password_hasher')
+    if hasher is not None:
+        hasher.shutdown()
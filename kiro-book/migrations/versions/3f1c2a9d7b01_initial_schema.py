@@ -0,0 +1,112 @@
+"""Initial schema
+
+Revision ID: 3f1c2a9d7b01
+Revises: 
+Create Date: 2026-10-16 09:12:44.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7b01'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('users',
+    sa.Column('user_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=False),
+    sa.Column('alias', sa.String(length=100), nullable=False),
+    sa.Column('bio', sa.Text(), nullable=True),
+    sa.Column('registration_date', sa.DateTime(), nullable=False),
+    sa.Column('invite_code_used', sa.String(length=20), nullable=False),
+    sa.Column('personal_invite_code', sa.String(length=20), nullable=False),
+    sa.Column('invites_used_count', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id'),
+    sa.UniqueConstraint('email'),
+    sa.UniqueConstraint('personal_invite_code')
+    )
+    op.create_table('books',
+    sa.Column('book_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('author', sa.String(length=255), nullable=False),
+    sa.Column('isbn', sa.String(length=20), nullable=True),
+    sa.Column('purchase_url', sa.String(length=512), nullable=True),
+    sa.Column('recommendation_rating', sa.Integer(), nullable=False),
+    sa.Column('is_available', sa.Boolean(), nullable=False),
+    sa.Column('is_hidden', sa.Boolean(), nullable=False),
+    sa.Column('is_fiction', sa.Boolean(), nullable=False),
+    sa.Column('current_borrower_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['current_borrower_id'], ['users.user_id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('book_id')
+    )
+    op.create_table('invite_codes',
+    sa.Column('invite_code', sa.String(length=20), nullable=False),
+    sa.Column('creator_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('times_used', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['creator_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('invite_code')
+    )
+    op.create_table('book_comments',
+    sa.Column('comment_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('comment_text', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['books.book_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('comment_id')
+    )
+    op.create_table('book_upvotes',
+    sa.Column('upvote_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['books.book_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('upvote_id'),
+    sa.UniqueConstraint('book_id', 'user_id', name='uq_book_user_upvote')
+    )
+    op.create_table('borrow_requests',
+    sa.Column('request_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('requester_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['books.book_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['requester_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('request_id')
+    )
+    op.create_table('borrowing_history',
+    sa.Column('borrow_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('borrower_id', sa.Integer(), nullable=False),
+    sa.Column('borrow_date', sa.DateTime(), nullable=False),
+    sa.Column('return_date', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['book_id'], ['books.book_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['borrower_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('borrow_id')
+    )
+
+
+def downgrade():
+    op.drop_table('borrowing_history')
+    op.drop_table('borrow_requests')
+    op.drop_table('book_upvotes')
+    op.drop_table('book_comments')
+    op.drop_table('invite_codes')
+    op.drop_table('books')
+    op.drop_table('users')
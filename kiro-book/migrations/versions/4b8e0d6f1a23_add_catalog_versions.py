@@ -0,0 +1,46 @@
+"""Add catalog_versions change counter for conditional GET
+
+Revision ID: 4b8e0d6f1a23
+Revises: e21b7f4a9c36
+Create Date: 2026-10-16 13:41:05.229871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b8e0d6f1a23'
+down_revision = 'e21b7f4a9c36'
+branch_labels = None
+depends_on = None
+
+_BUMP = "UPDATE catalog_versions SET version = version + 1, updated_at = datetime('now') WHERE name = 'catalog';"
+
+# Frozen copy of CATALOG_VERSION_DDL in src/models/catalog_version.py at this revision
+CATALOG_VERSION_DDL = (
+    "INSERT OR IGNORE INTO catalog_versions (name, version, updated_at) VALUES ('catalog', 0, datetime('now'))",
+    f"CREATE TRIGGER IF NOT EXISTS catalog_version_books_ai AFTER INSERT ON books BEGIN {_BUMP} END",
+    f"CREATE TRIGGER IF NOT EXISTS catalog_version_books_au AFTER UPDATE ON books BEGIN {_BUMP} END",
+    f"CREATE TRIGGER IF NOT EXISTS catalog_version_books_ad AFTER DELETE ON books BEGIN {_BUMP} END",
+    f"CREATE TRIGGER IF NOT EXISTS catalog_version_users_au AFTER UPDATE OF alias, bio ON users BEGIN {_BUMP} END",
+)
+
+
+def upgrade():
+    op.create_table('catalog_versions',
+    sa.Column('name', sa.String(length=20), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    for statement in CATALOG_VERSION_DDL:
+        op.execute(statement)
+
+
+def downgrade():
+    op.execute('DROP TRIGGER IF EXISTS catalog_version_users_au')
+    op.execute('DROP TRIGGER IF EXISTS catalog_version_books_ad')
+    op.execute('DROP TRIGGER IF EXISTS catalog_version_books_au')
+    op.execute('DROP TRIGGER IF EXISTS catalog_version_books_ai')
+    op.drop_table('catalog_versions')
@@ -0,0 +1,76 @@
+"""Leave hidden books out of the user_stats book counters
+
+Revision ID: 5d1a7c3e9b28
+Revises: b7c4e2a9f061
+Create Date: 2026-10-17 10:22:48.905163
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d1a7c3e9b28'
+down_revision = 'b7c4e2a9f061'
+branch_labels = None
+depends_on = None
+
+BOOK_TRIGGERS = ('user_stats_books_ai', 'user_stats_books_ad', 'user_stats_books_au')
+
+# Frozen copies of the books triggers in src/models/user_stats.py at this revision
+UPGRADE_DDL = (
+    """CREATE TRIGGER IF NOT EXISTS user_stats_books_ai AFTER INSERT ON books BEGIN
+        UPDATE user_stats SET books_owned = books_owned + 1, books_lent_out = books_lent_out + (new.current_borrower_id IS NOT NULL), upvotes_received = upvotes_received + new.upvote_count WHERE user_id = new.owner_id AND NOT new.is_hidden;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS user_stats_books_ad AFTER DELETE ON books BEGIN
+        UPDATE user_stats SET books_owned = books_owned - 1, books_lent_out = books_lent_out - (old.current_borrower_id IS NOT NULL), upvotes_received = upvotes_received - old.upvote_count WHERE user_id = old.owner_id AND NOT old.is_hidden;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS user_stats_books_au AFTER UPDATE OF owner_id, current_borrower_id, upvote_count, is_hidden ON books
+    WHEN old.owner_id IS NOT new.owner_id
+        OR (old.current_borrower_id IS NULL) != (new.current_borrower_id IS NULL)
+        OR old.upvote_count != new.upvote_count
+        OR old.is_hidden != new.is_hidden
+    BEGIN
+        UPDATE user_stats SET books_owned = books_owned - 1, books_lent_out = books_lent_out - (old.current_borrower_id IS NOT NULL), upvotes_received = upvotes_received - old.upvote_count WHERE user_id = old.owner_id AND NOT old.is_hidden;
+        UPDATE user_stats SET books_owned = books_owned + 1, books_lent_out = books_lent_out + (new.current_borrower_id IS NOT NULL), upvotes_received = upvotes_received + new.upvote_count WHERE user_id = new.owner_id AND NOT new.is_hidden;
+    END""",
+)
+
+# The triggers from d8e1f5b3a702, which counted hidden books too
+DOWNGRADE_DDL = (
+    """CREATE TRIGGER IF NOT EXISTS user_stats_books_ai AFTER INSERT ON books BEGIN
+        UPDATE user_stats SET books_owned = books_owned + 1, books_lent_out = books_lent_out + (new.current_borrower_id IS NOT NULL), upvotes_received = upvotes_received + new.upvote_count WHERE user_id = new.owner_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS user_stats_books_ad AFTER DELETE ON books BEGIN
+        UPDATE user_stats SET books_owned = books_owned - 1, books_lent_out = books_lent_out - (old.current_borrower_id IS NOT NULL), upvotes_received = upvotes_received - old.upvote_count WHERE user_id = old.owner_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS user_stats_books_au AFTER UPDATE OF owner_id, current_borrower_id, upvote_count ON books
+    WHEN old.owner_id IS NOT new.owner_id
+        OR (old.current_borrower_id IS NULL) != (new.current_borrower_id IS NULL)
+        OR old.upvote_count != new.upvote_count
+    BEGIN
+        UPDATE user_stats SET books_owned = books_owned - 1, books_lent_out = books_lent_out - (old.current_borrower_id IS NOT NULL), upvotes_received = upvotes_received - old.upvote_count WHERE user_id = old.owner_id;
+        UPDATE user_stats SET books_owned = books_owned + 1, books_lent_out = books_lent_out + (new.current_borrower_id IS NOT NULL), upvotes_received = upvotes_received + new.upvote_count WHERE user_id = new.owner_id;
+    END""",
+)
+
+RECOUNT = """UPDATE user_stats SET
+        books_owned = (SELECT count(*) FROM books WHERE books.owner_id = user_stats.user_id {visible}),
+        books_lent_out = (SELECT count(current_borrower_id) FROM books WHERE books.owner_id = user_stats.user_id {visible}),
+        upvotes_received = (SELECT coalesce(sum(upvote_count), 0) FROM books WHERE books.owner_id = user_stats.user_id {visible})"""
+
+
+def _replace_triggers(statements, visible):
+    for name in BOOK_TRIGGERS:
+        op.execute(f'DROP TRIGGER IF EXISTS {name}')
+    for statement in statements:
+        op.execute(statement)
+    op.execute(RECOUNT.format(visible=visible))
+
+
+def upgrade():
+    _replace_triggers(UPGRADE_DDL, 'AND NOT books.is_hidden')
+
+
+def downgrade():
+    _replace_triggers(DOWNGRADE_DDL, '')
@@ -0,0 +1,32 @@
+"""Add denormalized books.upvote_count
+
+Revision ID: 8a47e6c05d12
+Revises: 3f1c2a9d7b01
+Create Date: 2026-10-16 09:14:02.771946
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a47e6c05d12'
+down_revision = '3f1c2a9d7b01'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('books', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('upvote_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from the existing upvotes
+    op.execute(
+        'UPDATE books SET upvote_count = '
+        '(SELECT COUNT(*) FROM book_upvotes WHERE book_upvotes.book_id = books.book_id)'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('books', schema=None) as batch_op:
+        batch_op.drop_column('upvote_count')
@@ -0,0 +1,37 @@
+"""Add upvote_journal for the write-coalescing upvote queue
+
+Revision ID: 9d2c6a1e7f45
+Revises: 4b8e0d6f1a23
+Create Date: 2026-10-16 23:12:47.530918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d2c6a1e7f45'
+down_revision = '4b8e0d6f1a23'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('upvote_journal',
+    sa.Column('entry_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['books.book_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('entry_id')
+    )
+    with op.batch_alter_table('upvote_journal', schema=None) as batch_op:
+        batch_op.create_index('ix_upvote_journal_book_user', ['book_id', 'user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('upvote_journal', schema=None) as batch_op:
+        batch_op.drop_index('ix_upvote_journal_book_user')
+
+    op.drop_table('upvote_journal')
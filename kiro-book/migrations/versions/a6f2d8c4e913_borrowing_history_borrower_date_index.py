@@ -0,0 +1,28 @@
+"""Index a borrower's history by borrow date for the paginated history tab
+
+Revision ID: a6f2d8c4e913
+Revises: 9d2c6a1e7f45
+Create Date: 2026-10-16 23:41:05.218364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6f2d8c4e913'
+down_revision = '9d2c6a1e7f45'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('borrowing_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_borrowing_history_borrower')
+        batch_op.create_index('ix_borrowing_history_borrower_date', ['borrower_id', 'borrow_date', 'borrow_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('borrowing_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_borrowing_history_borrower_date')
+        batch_op.create_index('ix_borrowing_history_borrower', ['borrower_id'], unique=False)
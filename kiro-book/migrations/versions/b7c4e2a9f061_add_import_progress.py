@@ -0,0 +1,31 @@
+"""Add import_progress for resumable catalog imports
+
+Revision ID: b7c4e2a9f061
+Revises: f3b7a1c9d254
+Create Date: 2026-10-17 09:41:05.218334
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7c4e2a9f061'
+down_revision = 'f3b7a1c9d254'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('import_progress',
+    sa.Column('source', sa.String(length=1024), nullable=False),
+    sa.Column('records', sa.Integer(), nullable=False),
+    sa.Column('imported', sa.Integer(), nullable=False),
+    sa.Column('rejected', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('source')
+    )
+
+
+def downgrade():
+    op.drop_table('import_progress')
@@ -0,0 +1,60 @@
+"""Add indexes for dashboard, profile and borrow lookups
+
+Revision ID: c5d93b2e4f70
+Revises: 8a47e6c05d12
+Create Date: 2026-10-16 09:20:31.104587
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d93b2e4f70'
+down_revision = '8a47e6c05d12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('books', schema=None) as batch_op:
+        batch_op.create_index('ix_books_public_created', ['created_at', 'book_id'], unique=False,
+                              sqlite_where=sa.text('is_hidden = 0'))
+        batch_op.create_index('ix_books_public_fiction_created', ['is_fiction', 'created_at', 'book_id'], unique=False,
+                              sqlite_where=sa.text('is_hidden = 0'))
+        batch_op.create_index('ix_books_public_available_created', ['is_available', 'created_at', 'book_id'], unique=False,
+                              sqlite_where=sa.text('is_hidden = 0'))
+        batch_op.create_index('ix_books_owner_available', ['owner_id', 'is_available'], unique=False)
+        batch_op.create_index('ix_books_current_borrower', ['current_borrower_id'], unique=False,
+                              sqlite_where=sa.text('current_borrower_id IS NOT NULL'))
+
+    with op.batch_alter_table('borrow_requests', schema=None) as batch_op:
+        batch_op.create_index('ix_borrow_requests_book_requester_status', ['book_id', 'requester_id', 'status'], unique=False)
+        batch_op.create_index('ix_borrow_requests_requester', ['requester_id'], unique=False)
+
+    with op.batch_alter_table('borrowing_history', schema=None) as batch_op:
+        batch_op.create_index('ix_borrowing_history_book_borrower_return', ['book_id', 'borrower_id', 'return_date'], unique=False)
+        batch_op.create_index('ix_borrowing_history_borrower', ['borrower_id'], unique=False)
+
+    with op.batch_alter_table('book_comments', schema=None) as batch_op:
+        batch_op.create_index('ix_book_comments_book_created', ['book_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('book_comments', schema=None) as batch_op:
+        batch_op.drop_index('ix_book_comments_book_created')
+
+    with op.batch_alter_table('borrowing_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_borrowing_history_borrower')
+        batch_op.drop_index('ix_borrowing_history_book_borrower_return')
+
+    with op.batch_alter_table('borrow_requests', schema=None) as batch_op:
+        batch_op.drop_index('ix_borrow_requests_requester')
+        batch_op.drop_index('ix_borrow_requests_book_requester_status')
+
+    with op.batch_alter_table('books', schema=None) as batch_op:
+        batch_op.drop_index('ix_books_current_borrower')
+        batch_op.drop_index('ix_books_owner_available')
+        batch_op.drop_index('ix_books_public_available_created')
+        batch_op.drop_index('ix_books_public_fiction_created')
+        batch_op.drop_index('ix_books_public_created')
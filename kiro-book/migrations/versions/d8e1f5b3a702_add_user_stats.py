@@ -0,0 +1,80 @@
+"""Add user_stats counters maintained by triggers
+
+Revision ID: d8e1f5b3a702
+Revises: a6f2d8c4e913
+Create Date: 2026-10-17 00:05:12.604317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8e1f5b3a702'
+down_revision = 'a6f2d8c4e913'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of USER_STATS_DDL in src/models/user_stats.py at this revision
+USER_STATS_DDL = (
+    """CREATE TRIGGER IF NOT EXISTS user_stats_users_ai AFTER INSERT ON users BEGIN
+        INSERT OR IGNORE INTO user_stats (user_id) VALUES (new.user_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS user_stats_users_ad AFTER DELETE ON users BEGIN
+        DELETE FROM user_stats WHERE user_id = old.user_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS user_stats_books_ai AFTER INSERT ON books BEGIN
+        UPDATE user_stats SET books_owned = books_owned + 1, books_lent_out = books_lent_out + (new.current_borrower_id IS NOT NULL), upvotes_received = upvotes_received + new.upvote_count WHERE user_id = new.owner_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS user_stats_books_ad AFTER DELETE ON books BEGIN
+        UPDATE user_stats SET books_owned = books_owned - 1, books_lent_out = books_lent_out - (old.current_borrower_id IS NOT NULL), upvotes_received = upvotes_received - old.upvote_count WHERE user_id = old.owner_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS user_stats_books_au AFTER UPDATE OF owner_id, current_borrower_id, upvote_count ON books
+    WHEN old.owner_id IS NOT new.owner_id
+        OR (old.current_borrower_id IS NULL) != (new.current_borrower_id IS NULL)
+        OR old.upvote_count != new.upvote_count
+    BEGIN
+        UPDATE user_stats SET books_owned = books_owned - 1, books_lent_out = books_lent_out - (old.current_borrower_id IS NOT NULL), upvotes_received = upvotes_received - old.upvote_count WHERE user_id = old.owner_id;
+        UPDATE user_stats SET books_owned = books_owned + 1, books_lent_out = books_lent_out + (new.current_borrower_id IS NOT NULL), upvotes_received = upvotes_received + new.upvote_count WHERE user_id = new.owner_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS user_stats_history_ai AFTER INSERT ON borrowing_history BEGIN
+        UPDATE user_stats SET books_borrowed = books_borrowed + 1 WHERE user_id = new.borrower_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS user_stats_history_ad AFTER DELETE ON borrowing_history BEGIN
+        UPDATE user_stats SET books_borrowed = books_borrowed - 1 WHERE user_id = old.borrower_id;
+    END""",
+)
+
+BACKFILL = """INSERT INTO user_stats (user_id, books_owned, books_lent_out, books_borrowed, upvotes_received)
+    SELECT users.user_id,
+        (SELECT count(*) FROM books WHERE books.owner_id = users.user_id),
+        (SELECT count(current_borrower_id) FROM books WHERE books.owner_id = users.user_id),
+        (SELECT count(*) FROM borrowing_history WHERE borrowing_history.borrower_id = users.user_id),
+        (SELECT coalesce(sum(upvote_count), 0) FROM books WHERE books.owner_id = users.user_id)
+    FROM users"""
+
+
+def upgrade():
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('books_owned', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('books_lent_out', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('books_borrowed', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('upvotes_received', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.execute(BACKFILL)
+    for statement in USER_STATS_DDL:
+        op.execute(statement)
+
+
+def downgrade():
+    op.execute('DROP TRIGGER IF EXISTS user_stats_history_ad')
+    op.execute('DROP TRIGGER IF EXISTS user_stats_history_ai')
+    op.execute('DROP TRIGGER IF EXISTS user_stats_books_au')
+    op.execute('DROP TRIGGER IF EXISTS user_stats_books_ad')
+    op.execute('DROP TRIGGER IF EXISTS user_stats_books_ai')
+    op.execute('DROP TRIGGER IF EXISTS user_stats_users_ad')
+    op.execute('DROP TRIGGER IF EXISTS user_stats_users_ai')
+    op.drop_table('user_stats')
@@ -0,0 +1,54 @@
+"""Add books_fts full-text search index
+
+Revision ID: e21b7f4a9c36
+Revises: c5d93b2e4f70
+Create Date: 2026-10-16 11:02:17.362914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e21b7f4a9c36'
+down_revision = 'c5d93b2e4f70'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of BOOKS_FTS_DDL in src/models/book.py at this revision
+FTS_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+        title, author, isbn,
+        content='books', content_rowid='book_id',
+        tokenize='unicode61 remove_diacritics 2', prefix='3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN
+        INSERT INTO books_fts(rowid, title, author, isbn)
+        VALUES (new.book_id, new.title, new.author, new.isbn);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN
+        INSERT INTO books_fts(books_fts, rowid, title, author, isbn)
+        VALUES ('delete', old.book_id, old.title, old.author, old.isbn);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, author, isbn ON books BEGIN
+        INSERT INTO books_fts(books_fts, rowid, title, author, isbn)
+        VALUES ('delete', old.book_id, old.title, old.author, old.isbn);
+        INSERT INTO books_fts(rowid, title, author, isbn)
+        VALUES (new.book_id, new.title, new.author, new.isbn);
+    END""",
+)
+
+
+def upgrade():
+    for statement in FTS_DDL:
+        op.execute(statement)
+
+    # Index the books that already exist
+    op.execute("INSERT INTO books_fts(books_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    op.execute('DROP TRIGGER IF EXISTS books_fts_au')
+    op.execute('DROP TRIGGER IF EXISTS books_fts_ad')
+    op.execute('DROP TRIGGER IF EXISTS books_fts_ai')
+    op.execute('DROP TABLE IF EXISTS books_fts')
@@ -0,0 +1,47 @@
+"""Add denormalized books.comment_count kept by triggers
+
+Revision ID: f3b7a1c9d254
+Revises: d8e1f5b3a702
+Create Date: 2026-10-17 00:31:48.915027
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b7a1c9d254'
+down_revision = 'd8e1f5b3a702'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of COMMENT_COUNT_DDL in src/models/book_comment.py at this revision
+COMMENT_COUNT_DDL = (
+    """CREATE TRIGGER IF NOT EXISTS book_comments_count_ai AFTER INSERT ON book_comments BEGIN
+        UPDATE books SET comment_count = comment_count + 1 WHERE book_id = new.book_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS book_comments_count_ad AFTER DELETE ON book_comments BEGIN
+        UPDATE books SET comment_count = comment_count - 1 WHERE book_id = old.book_id;
+    END""",
+)
+
+
+def upgrade():
+    with op.batch_alter_table('books', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from the existing comments
+    op.execute(
+        'UPDATE books SET comment_count = '
+        '(SELECT COUNT(*) FROM book_comments WHERE book_comments.book_id = books.book_id)'
+    )
+    for statement in COMMENT_COUNT_DDL:
+        op.execute(statement)
+
+
+def downgrade():
+    op.execute('DROP TRIGGER IF EXISTS book_comments_count_ad')
+    op.execute('DROP TRIGGER IF EXISTS book_comments_count_ai')
+    # Native DROP COLUMN: a batch rebuild of books would drop its search,
+    # catalog version and user_stats triggers
+    op.execute('ALTER TABLE books DROP COLUMN comment_count')
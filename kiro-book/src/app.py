@@ -5,11 +5,14 @@ import os
 from flask import Flask
 from pathlib import Path
 
-from src.extensions import db, login_manager, migrate, csrf
-from src.models import User, Book, BookComment, BorrowingHistory, InviteCode, BookUpvote, BorrowRequest
+from src.extensions import db, login_manager, csrf
 
 def create_app(test_config=None):
-    """Create and configure the Flask application."""
+    """Create and configure the Flask application.
+    
+    Building the app never touches the database; `flask init-db` creates the
+    schema and the initial invite code.
+    """
     app = Flask(__name__, instance_relative_config=True)
     
     # Ensure the instance folder exists with absolute path
@@ -36,42 +39,69 @@ def create_app(test_config=None):
     # Initialize extensions with the app
     db.init_app(app)
     login_manager.init_app(app)
-    migrate.init_app(app, db)
     csrf.init_app(app)
     
+    # Tune SQLite connections for many concurrent workers
+    from src.sqlite_tuning import init_sqlite_tuning
+    init_sqlite_tuning(app)
+    
+    # Keep SQLite calls off the gevent hub
+    from src.db_threadpool import init_db_threadpool
+    init_db_threadpool(app)
+    
+    # Optionally share compiled templates between workers on disk
+    from src.template_cache import init_template_cache
+    init_template_cache(app)
+    
     # Register blueprints
     from src.routes.main import main_bp
     from src.routes.auth import auth_bp
     from src.routes.books import books_bp
     from src.routes.profile import profile_bp
+    from src.routes.api import api_bp
     
     app.register_blueprint(main_bp)
     app.register_blueprint(auth_bp)
     app.register_blueprint(books_bp)
     app.register_blueprint(profile_bp)
+    app.register_blueprint(api_bp)
+    
+    # Serve fingerprinted, precompressed static files once they are built
+    from src.static_assets import init_static_assets
+    init_static_assets(app)
+    
+    # Cache rendered book cards per worker
+    from src.fragment_cache import init_fragment_cache
+    init_fragment_cache(app)
+    
+    # Hash passwords off the request's worker process
+    from src.passwords import init_password_hasher
+    init_password_hasher(app)
+    
+    # Cache logged-in users' identities per worker
+    from src.user_cache import init_user_cache
+    init_user_cache(app)
+    
+    # Flag lazy loads during template rendering (debug mode by default)
+    from src.loading import init_lazy_load_guard
+    init_lazy_load_guard(app)
+    
+    # Optionally report per-request query and template timings
+    from src.instrumentation import init_instrumentation
+    init_instrumentation(app)
+
+    # Optionally batch upvote writes through a journal
+    from src.upvote_queue import init_upvote_queue
+    init_upvote_queue(app)
     
-    # Create database tables
-    with app.app_context():
-        db.create_all()
+    # Migrations and custom commands are only used by the `flask` command, so
+    # server workers skip them (and the Alembic import)
+    if app.config.get('CLI_COMMANDS', os.environ.get('FLASK_RUN_FROM_CLI') == 'true'):
+        from flask_migrate import Migrate
+        Migrate(app, db, render_as_batch=True)
         
-        # Create initial invite code if none exists
-        if not InviteCode.query.first():
-            # Create a special system user for the initial invite code
-            system_user = User.query.filter_by(email="system@bookshare.app").first()
-            if not system_user:
-                system_user = User(
-                    email="system@bookshare.app",
-                    password=os.urandom(24).hex(),  # Random secure password
-                    alias="System",
-                    invite_code_used="SYSTEM"
-                )
-                db.session.add(system_user)
-                db.session.commit()
-            
-            # Create the initial invite code with the system user as creator
-            initial_code = InviteCode(invite_code='INITIAL', creator_id=system_user.user_id)
-            db.session.add(initial_code)
-            db.session.commit()
+        from src.commands import register_commands
+        register_commands(app)
     
     return app
 
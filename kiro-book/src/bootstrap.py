@@ -0,0 +1,53 @@
+"""
+One-time database setup for the book sharing application.
+
+create_app no longer touches the database, so building the schema and adding
+the first invite code is an explicit step: `flask init-db` in a deployment
+(which runs the migrations), or init_database() for a throwaway database in
+the benchmarks.
+"""
+import os
+
+from sqlalchemy.exc import IntegrityError
+
+from src.extensions import db
+from src.models import InviteCode, User
+
+SYSTEM_EMAIL = 'system@bookshare.app'
+INITIAL_INVITE_CODE = 'INITIAL'
+
+def ensure_initial_invite():
+    """
+    Create the system user and the INITIAL invite code unless some invite code exists.
+    
+    Returns True if the code was created. Running it from two processes at
+    once is safe: the loser's insert hits the primary key and is rolled back.
+    """
+    if db.session.scalar(db.select(InviteCode.invite_code).limit(1)) is not None:
+        return False
+    
+    try:
+        # Create a special system user for the initial invite code
+        system_user = User.query.filter_by(email=SYSTEM_EMAIL).first()
+        if not system_user:
+            system_user = User(
+                email=SYSTEM_EMAIL,
+                password=os.urandom(24).hex(),  # Random secure password
+                alias="System",
+                invite_code_used="SYSTEM"
+            )
+            db.session.add(system_user)
+            db.session.flush()
+        
+        # Create the initial invite code with the system user as creator
+        db.session.add(InviteCode(invite_code=INITIAL_INVITE_CODE, creator_id=system_user.user_id))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return False
+    return True
+
+def init_database():
+    """Create every table, index and trigger on an empty database, then the initial invite code."""
+    db.create_all()
+    return ensure_initial_invite()
@@ -0,0 +1,324 @@
+"""
+Bulk catalog import for the book sharing application.
+
+Reads books from a CSV or JSONL file one record at a time, checks each with
+the validators declared on BookForm, resolves owners by email through one map
+loaded up front and inserts the valid rows in large executemany batches, one
+transaction per batch. The per-row AFTER INSERT triggers on books are set
+aside inside each batch's transaction and their work (search index, owner
+user_stats, catalog version) is done once per batch. The same transaction
+records how far the import got in import_progress, so an interrupted import
+resumes where it stopped without inserting any batch twice; rejected records
+go to an error report with the reasons.
+
+Recognised fields (CSV header or JSON keys): title, author, isbn,
+purchase_url, rating (or recommendation_rating), fiction (or is_fiction:
+fiction/non-fiction or true/false) and owner_email (or owner).
+"""
+import csv
+import json
+from datetime import datetime
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from wtforms.validators import DataRequired, Length, NumberRange, Optional, StopValidation, ValidationError
+
+from src.extensions import db
+from src.forms.book import BookForm
+from src.models import Book, CatalogVersion, ImportProgress, User
+
+DEFAULT_BATCH_SIZE = 10000
+
+# Alternative spellings accepted in import files
+FIELD_ALIASES = {
+    'rating': 'recommendation_rating',
+    'fiction': 'is_fiction',
+    'owner': 'owner_email',
+}
+
+BOOK_FIELDS = ('title', 'author', 'isbn', 'purchase_url', 'recommendation_rating', 'is_fiction')
+
+# AFTER INSERT triggers on books, each with the statement that does its work for
+# a whole batch (the rows with book_id > :last); imported books are never lent
+# out and have no upvotes, so owners only gain books_owned
+BATCH_TRIGGERS = {
+    'books_fts_ai': 'INSERT INTO books_fts(rowid, title, author, isbn) '
+                    'SELECT book_id, title, author, isbn FROM books WHERE book_id > :last',
+    'user_stats_books_ai': 'UPDATE user_stats SET books_owned = books_owned + '
+                           '(SELECT count(*) FROM books WHERE books.owner_id = user_stats.user_id '
+                           'AND book_id > :last AND NOT is_hidden) '
+                           'WHERE user_id IN (SELECT owner_id FROM books WHERE book_id > :last AND NOT is_hidden)',
+    'catalog_version_books_ai': None,
+}
+
+TRUE_VALUES = {'fiction', 'true', 'yes', 'y', '1'}
+FALSE_VALUES = {'non-fiction', 'nonfiction', 'false', 'no', 'n', '0'}
+
+class _Value:
+    """Just enough of a WTForms field for BookForm's validators to check one value."""
+    
+    def __init__(self, label, value):
+        self.label = label
+        self.flags = None
+        self.data = value
+        self.raw_data = [value] if value not in (None, '') else []
+        self.errors = []
+    
+    def gettext(self, message):
+        return message
+    
+    def ngettext(self, singular, plural, n):
+        return singular if n == 1 else plural
+
+def _validators(form_class, name):
+    unbound = getattr(form_class, name)
+    return unbound.kwargs.get('validators', ())
+
+def _check(name, value):
+    """Run BookForm's validators for name against value; return the error messages."""
+    field = _Value(name, value)
+    for validator in RULES[name]:
+        try:
+            validator(None, field)
+        except StopValidation as stop:
+            if stop.args and stop.args[0]:
+                field.errors.append(stop.args[0])
+            break
+        except ValidationError as error:
+            field.errors.append(error.args[0])
+    return field.errors
+
+def _passes(name, validators):
+    """
+    A quick pass/fail test equivalent to validators for the common ones.
+    
+    Building a field and running each validator costs more than inserting
+    the row, so the stock WTForms validators become plain comparisons and
+    only values that fail go through _check for the form's exact messages.
+    """
+    tests = []
+    for validator in validators:
+        if isinstance(validator, Optional) and not tests:
+            tests.append(None)
+        elif isinstance(validator, DataRequired):
+            tests.append(bool)
+        elif isinstance(validator, Length):
+            low, high = validator.min, validator.max
+            tests.append(lambda value, low=low, high=high: low <= len(value or '') and (high == -1 or len(value or '') <= high))
+        elif isinstance(validator, NumberRange):
+            low, high = validator.min, validator.max
+            tests.append(lambda value, low=low, high=high: value is not None
+                         and (low is None or value >= low) and (high is None or value <= high))
+        else:
+            tests.append(lambda value, validator=validator: not _check_one(validator, name, value))
+    optional = bool(tests) and tests[0] is None
+    tests = [test for test in tests if test is not None]
+    return lambda value: (optional and not value) or all(test(value) for test in tests)
+
+def _check_one(validator, name, value):
+    field = _Value(name, value)
+    try:
+        validator(None, field)
+    except (StopValidation, ValidationError) as error:
+        return error.args[0] if error.args else None
+    return None
+
+# Validators per field, read once from the form so imports follow its rules
+RULES = {name: _validators(BookForm, name) for name in BOOK_FIELDS if name != 'is_fiction'}
+PASSES = {name: _passes(name, validators) for name, validators in RULES.items()}
+
+def clean_record(record, owners):
+    """Validate one import record; return (row values, None) or (None, errors)."""
+    record = {FIELD_ALIASES.get(key, key): value for key, value in record.items() if key}
+    values = {}
+    errors = []
+    
+    for name in ('title', 'author', 'isbn', 'purchase_url'):
+        value = record.get(name)
+        value = value.strip() if isinstance(value, str) else value
+        values[name] = value or None
+        if not PASSES[name](value):
+            errors += [f'{name}: {message}' for message in _check(name, value)]
+    
+    rating = record.get('recommendation_rating')
+    try:
+        rating = int(rating) if rating not in (None, '') else None
+    except (TypeError, ValueError):
+        errors.append('rating: Not a valid integer value.')
+    else:
+        values['recommendation_rating'] = rating
+        if not PASSES['recommendation_rating'](rating):
+            errors += [f'rating: {message}' for message in _check('recommendation_rating', rating)]
+    
+    fiction = record.get('is_fiction', 'fiction')
+    flag = str(fiction).strip().lower() if fiction is not None else 'fiction'
+    if flag in TRUE_VALUES:
+        values['is_fiction'] = True
+    elif flag in FALSE_VALUES:
+        values['is_fiction'] = False
+    else:
+        errors.append('fiction: Not a valid choice.')
+    
+    email = (record.get('owner_email') or '').strip().lower()
+    values['owner_id'] = owners.get(email)
+    if values['owner_id'] is None:
+        errors.append(f'owner_email: No user with email {email!r}.' if email else 'owner_email: This field is required.')
+    
+    return (None, errors) if errors else (values, None)
+
+def read_records(path, file_format):
+    """Yield (record, error) for each record in a CSV or JSONL file, without loading it all."""
+    if file_format == 'csv':
+        with open(path, newline='', encoding='utf-8-sig') as file:
+            for record in csv.DictReader(file):
+                yield record, None
+        return
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield {'line': line.rstrip('\n')}, f'Invalid JSON: {exc}'
+                continue
+            if isinstance(record, dict):
+                yield record, None
+            else:
+                yield {'line': line.rstrip('\n')}, 'Invalid JSON: expected an object'
+
+def owner_map():
+    """Every user's lower-cased email mapped to their id, read in one query."""
+    return {email.lower(): user_id for email, user_id in db.session.execute(db.select(User.email, User.user_id))}
+
+INSERT_COLUMNS = BOOK_FIELDS + ('owner_id', 'is_available', 'is_hidden', 'current_borrower_id',
+                                'upvote_count', 'comment_count', 'created_at', 'updated_at')
+INSERT_BOOK = (f'INSERT INTO books ({", ".join(INSERT_COLUMNS)}) '
+               f'VALUES ({", ".join(":" + column for column in INSERT_COLUMNS)})')
+
+def batch_triggers():
+    """{name: CREATE TRIGGER sql} for the installed triggers in BATCH_TRIGGERS."""
+    if db.engine.dialect.name != 'sqlite':
+        return {}
+    return dict(db.session.execute(
+        text("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name IN :names")
+        .bindparams(bindparam('names', expanding=True)),
+        {'names': list(BATCH_TRIGGERS)}
+    ).all())
+
+def insert_batch(rows, triggers, checkpoint):
+    """
+    Insert rows, save checkpoint and commit, with the given books triggers set aside.
+    
+    Firing the triggers once per row costs several times the insert itself, so
+    they are dropped, the rows go in with one executemany, each trigger's work
+    is done for the whole batch and the triggers are created again, all in one
+    transaction. SQLite DDL is transactional, so no other connection ever sees
+    the table without its triggers.
+    """
+    # The catalog changes either way; as the first write this also opens the
+    # transaction, so the DDL below runs inside it
+    db.session.execute(
+        db.update(CatalogVersion).where(CatalogVersion.name == 'catalog')
+        .values(version=CatalogVersion.version + 1, updated_at=datetime.utcnow())
+    )
+    last = db.session.scalar(db.select(db.func.coalesce(db.func.max(Book.book_id), 0)))
+    for name in triggers:
+        db.session.execute(text(f'DROP TRIGGER {name}'))
+    # Straight to the driver: the values are already in the column types
+    # SQLite stores, and SQLAlchemy's per-row bind processing would double
+    # the cost of the insert
+    db.session.connection().exec_driver_sql(INSERT_BOOK, rows)
+    for name, sql in triggers.items():
+        if BATCH_TRIGGERS[name]:
+            db.session.execute(text(BATCH_TRIGGERS[name]), {'last': last})
+        db.session.execute(text(sql))
+    checkpoint.save()
+    db.session.commit()
+
+class Checkpoint:
+    """How far an import of one source file got, kept in import_progress."""
+    
+    def __init__(self, source):
+        self.source = source
+        self.records = 0
+        self.imported = 0
+        self.rejected = 0
+    
+    def load(self):
+        """Pick up a previous run of the same source file; False if there is none."""
+        saved = db.session.get(ImportProgress, self.source)
+        if saved is None:
+            return False
+        self.records, self.imported, self.rejected = saved.records, saved.imported, saved.rejected
+        return True
+    
+    def save(self):
+        """Write the counters in the current transaction; they commit with it."""
+        values = {'records': self.records, 'imported': self.imported,
+                  'rejected': self.rejected, 'updated_at': datetime.utcnow()}
+        db.session.execute(
+            sqlite_insert(ImportProgress.__table__).values(source=self.source, **values)
+            .on_conflict_do_update(index_elements=['source'], set_=values)
+        )
+    
+    def clear(self):
+        db.session.execute(db.delete(ImportProgress).where(ImportProgress.source == self.source))
+        db.session.commit()
+
+def import_books(path, file_format, checkpoint, error_path, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """
+    Import books from path, resuming after checkpoint.records if it was loaded.
+    
+    Returns the checkpoint with the totals. Each batch is inserted in the
+    same transaction that moves the checkpoint past it, so after a crash the
+    batch in flight is either fully imported and skipped, or redone.
+    """
+    owners = owner_map()
+    triggers = batch_triggers()
+    resuming = checkpoint.records > 0
+    skip = checkpoint.records
+    batch, rejected = [], []
+    pending = 0
+    
+    with open(error_path, 'a' if resuming else 'w', newline='', encoding='utf-8') as error_file:
+        report = csv.writer(error_file)
+        if not resuming:
+            report.writerow(('record', 'errors', 'data'))
+        
+        def flush():
+            nonlocal batch, rejected, pending
+            checkpoint.records += pending
+            checkpoint.imported += len(batch)
+            checkpoint.rejected += len(rejected)
+            if batch:
+                # The format SQLAlchemy's SQLite DateTime type stores
+                now = datetime.utcnow().isoformat(sep=' ', timespec='microseconds')
+                for row in batch:
+                    row['created_at'] = row['updated_at'] = now
+                insert_batch(batch, triggers, checkpoint)
+            else:
+                checkpoint.save()
+                db.session.commit()
+            # Rejections are reported with their batch so a resumed import doesn't repeat them
+            report.writerows(rejected)
+            error_file.flush()
+            if progress is not None:
+                progress(checkpoint)
+            batch, rejected, pending = [], [], 0
+        
+        for number, (record, error) in enumerate(read_records(path, file_format), start=1):
+            if number <= skip:
+                continue
+            pending += 1
+            values, problems = (None, [error]) if error else clean_record(record, owners)
+            if problems:
+                rejected.append((number, '; '.join(problems), json.dumps(record, default=str)))
+            else:
+                values.update(is_available=True, is_hidden=False, current_borrower_id=None,
+                              upvote_count=0, comment_count=0)
+                batch.append(values)
+            if pending >= batch_size:
+                flush()
+        flush()
+    return checkpoint
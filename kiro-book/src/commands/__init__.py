@@ -0,0 +1,18 @@
+"""
+CLI commands package for the book sharing application.
+"""
+from src.commands.assets import assets_cli
+from src.commands.books import books_cli
+from src.commands.explain import db_explain
+from src.commands.setup import init_db
+from src.commands.templates import templates_cli
+from src.commands.users import users_cli
+
+def register_commands(app):
+    """Attach the application's custom CLI commands to the Flask app."""
+    app.cli.add_command(assets_cli)
+    app.cli.add_command(books_cli)
+    app.cli.add_command(db_explain)
+    app.cli.add_command(init_db)
+    app.cli.add_command(templates_cli)
+    app.cli.add_command(users_cli)
@@ -0,0 +1,33 @@
+"""
+Static asset commands for the book sharing application.
+"""
+import os
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from src.static_assets import BUILD_DIR, brotli, build_assets
+
+assets_cli = AppGroup('assets', help='Static asset commands.')
+
+@assets_cli.command('build')
+def build():
+    """Fingerprint the static files and write their gzip/brotli variants.
+    
+    Run on every deploy, before the workers start: pages link the files
+    named in the new manifest as soon as the app is restarted.
+    """
+    static_folder = current_app.static_folder
+    manifest = build_assets(static_folder)
+    output = os.path.join(static_folder, BUILD_DIR)
+    for logical, built in manifest.items():
+        path = os.path.join(static_folder, built)
+        sizes = [f'{os.path.getsize(path)} B']
+        for suffix in ('.gz', '.br'):
+            if os.path.exists(path + suffix):
+                sizes.append(f'{suffix[1:]} {os.path.getsize(path + suffix)} B')
+        click.echo(f'{logical} -> {built} ({", ".join(sizes)})')
+    if brotli is None:
+        click.echo('brotli is not installed; only gzip variants were written.')
+    click.echo(f'{len(manifest)} file(s) built into {output}.')
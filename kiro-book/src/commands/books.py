@@ -0,0 +1,143 @@
+"""
+Book maintenance commands for the book sharing application.
+"""
+import os
+import time
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import bindparam, func
+
+from src import catalog_import
+from src.export import FORMATS, catalog_export
+from src.extensions import db
+from src.models import Book, BookUpvote, UpvoteJournal
+from src.search import rebuild_search_index
+
+books_cli = AppGroup('books', help='Book catalog maintenance commands.')
+
+@books_cli.command('recount-upvotes')
+@click.option('--dry-run', is_flag=True, help='Report drift without fixing it.')
+def recount_upvotes(dry_run):
+    """Rebuild Book.upvote_count from the book_upvotes table."""
+    actual = (
+        db.select(BookUpvote.book_id, func.count().label('actual'))
+        .group_by(BookUpvote.book_id)
+        .subquery()
+    )
+    rows = db.session.execute(
+        db.select(Book.book_id, Book.title, Book.upvote_count, func.coalesce(actual.c.actual, 0))
+        .outerjoin(actual, actual.c.book_id == Book.book_id)
+        .where(Book.upvote_count != func.coalesce(actual.c.actual, 0))
+    ).all()
+    
+    for book_id, title, stored, counted in rows:
+        click.echo(f'Book {book_id} ({title}): stored {stored}, actual {counted}')
+    
+    if rows and not dry_run:
+        # Only rewrite drifted rows, in one executemany batch
+        books = Book.__table__
+        db.session.execute(
+            db.update(books)
+            .where(books.c.book_id == bindparam('b_book_id'))
+            .values(upvote_count=bindparam('b_count'), updated_at=books.c.updated_at),
+            [{'b_book_id': book_id, 'b_count': counted} for book_id, _, _, counted in rows]
+        )
+        db.session.commit()
+    
+    action = 'found' if dry_run else 'fixed'
+    click.echo(f'{len(rows)} book(s) with drifted upvote counts {action}.')
+
+@books_cli.command('flush-upvotes')
+def flush_upvotes():
+    """Apply upvote toggles still waiting in the upvote journal."""
+    total = 0
+    while True:
+        applied = UpvoteJournal.flush()
+        total += applied
+        if not applied:
+            break
+    click.echo(f'{total} queued upvote toggle(s) applied.')
+
+@books_cli.command('reindex-search')
+def reindex_search():
+    """Rebuild the books_fts full-text index from the books table.
+    
+    Also recreates the index and its sync triggers if they are missing, e.g. on
+    a database created before search existed or after a table rebuild.
+    """
+    count = rebuild_search_index()
+    click.echo(f'Search index rebuilt for {count} book(s).')
+
+@books_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'file_format', type=click.Choice(['csv', 'jsonl']),
+              help='File format; guessed from the extension if omitted.')
+@click.option('--batch-size', default=catalog_import.DEFAULT_BATCH_SIZE, show_default=True,
+              help='Records per insert transaction.')
+@click.option('--errors', 'error_path', help='Rejected-record report [default: PATH.errors.csv].')
+@click.option('--restart', is_flag=True, help='Ignore saved progress and start from the top.')
+def import_books(path, file_format, batch_size, error_path, restart):
+    """Import books from a CSV or JSONL file.
+    
+    Records are checked with the same rules as the book form and owners are
+    matched by email. An interrupted import picks up after the last committed
+    batch when run again with the same file.
+    """
+    if file_format is None:
+        extension = os.path.splitext(path)[1].lower()
+        file_format = 'jsonl' if extension in ('.jsonl', '.ndjson') else 'csv'
+    checkpoint = catalog_import.Checkpoint(os.path.abspath(path))
+    error_path = error_path or f'{path}.errors.csv'
+    
+    if restart:
+        checkpoint.clear()
+    elif checkpoint.load():
+        click.echo(f'Resuming after record {checkpoint.records} ({checkpoint.imported} imported so far).')
+    
+    started = time.perf_counter()
+    first_record = checkpoint.records
+    catalog_import.import_books(
+        path, file_format, checkpoint, error_path, batch_size,
+        progress=lambda done: click.echo(f'{done.records} records read, {done.imported} imported', err=True)
+    )
+    elapsed = time.perf_counter() - started
+    checkpoint.clear()
+    
+    rate = (checkpoint.records - first_record) / elapsed if elapsed else 0
+    click.echo(f'{checkpoint.imported} book(s) imported, {checkpoint.rejected} rejected '
+               f'({rate:,.0f} records/s).')
+    if checkpoint.rejected:
+        click.echo(f'Rejected records and reasons: {error_path}')
+
+@books_cli.command('export')
+@click.argument('output', type=click.File('w', encoding='utf-8', lazy=True), default='-')
+@click.option('--format', 'file_format', type=click.Choice(list(FORMATS)),
+              help='Output format; guessed from the extension if omitted (CSV for stdout).')
+@click.option('--include-hidden', is_flag=True, help='Also export books hidden from public listings.')
+def export_books(output, file_format, include_hidden):
+    """Export the catalog as CSV or NDJSON to OUTPUT (default: stdout).
+    
+    Rows are streamed in book_id order with owners named by email, so the
+    file can be loaded elsewhere with `flask books import`.
+    """
+    if file_format is None:
+        extension = os.path.splitext(output.name)[1].lower()
+        file_format = 'ndjson' if extension in ('.jsonl', '.ndjson') else 'csv'
+    header, rows = catalog_export(include_hidden=include_hidden, owner_emails=True)
+    
+    count = 0
+    
+    def counted():
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield row
+    
+    _, _, writer = FORMATS[file_format]
+    started = time.perf_counter()
+    for chunk in writer(header, counted()):
+        output.write(chunk)
+    output.flush()
+    elapsed = time.perf_counter() - started
+    click.echo(f'{count} book(s) exported in {elapsed:.1f}s.', err=True)
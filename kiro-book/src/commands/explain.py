@@ -0,0 +1,117 @@
+"""
+Query plan inspection command for the book sharing application.
+"""
+import re
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import event
+
+from src.extensions import db
+from src.models import Book, BorrowRequest, BorrowingHistory, User
+
+# Statement kinds with a query plan worth checking (an INSERT ... VALUES has none)
+EXPLAINED = ('SELECT', 'UPDATE', 'DELETE')
+
+@click.command('db-explain')
+@click.option('--user-id', type=int, help='User to view the profile pages as (default: first book owner).')
+@with_appcontext
+def db_explain(user_id):
+    """Print EXPLAIN QUERY PLAN for every query and update the hot routes run."""
+    if user_id is None:
+        user_id = db.session.scalar(db.select(Book.owner_id).order_by(Book.book_id).limit(1))
+    book_id = db.session.scalar(db.select(Book.book_id).order_by(Book.book_id).limit(1)) or 1
+    request_id = db.session.scalar(db.select(BorrowRequest.request_id).order_by(BorrowRequest.request_id).limit(1)) or 1
+    user_id = user_id or 1
+
+    client = current_app.test_client()
+    if db.session.get(User, user_id):
+        # Log the client in through Flask-Login's session keys
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+            session['_fresh'] = True
+    else:
+        click.echo(f'No user {user_id}; profile pages will redirect to login.\n')
+
+    routes = [
+        '/',
+        '/?view=available',
+        '/?category=fiction',
+        '/?view=available&category=non-fiction',
+        '/books/',
+        '/books/search?q=the',
+        f'/books/{book_id}',
+        f'/books/{book_id}/comments',
+        '/profile/books',
+        '/profile/borrowed',
+        '/profile/history',
+        '/profile/history?tab=lent',
+        '/profile/history/export',
+        '/profile/requests',
+        f'/profile/{user_id}',
+    ]
+
+    # Lookups made by POST routes, run directly so they don't change any data
+    lookups = {
+        'books.request_borrow / books.view pending check': lambda: BorrowRequest.query.filter_by(
+            book_id=book_id, requester_id=user_id, status='pending').first(),
+        'books.approve_request lend, approve, reject the rest, record the loan': lambda: _rolled_back(
+            BorrowRequest.approval_statements(request_id, book_id, user_id)),
+        'books.return_book open loan': lambda: BorrowingHistory.query.filter_by(
+            book_id=book_id, borrower_id=user_id, return_date=None).first(),
+    }
+
+    scans = 0
+    for label, run in [(f'GET {url}', lambda url=url: client.get(url)) for url in routes] + list(lookups.items()):
+        statements = _capture_statements(run)
+        click.echo(label)
+        seen = set()
+        for statement, parameters in statements:
+            if statement in seen or not statement.lstrip().upper().startswith(EXPLAINED):
+                continue
+            seen.add(statement)
+            click.echo(f'  {" ".join(statement.split())[:110]}')
+            with db.engine.connect() as connection:
+                plan = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+            for row in plan:
+                detail = row[-1]
+                full_scan = _is_full_scan(detail)
+                scans += full_scan
+                click.echo(f'    {"!! " if full_scan else ""}{detail}')
+        click.echo()
+
+    click.echo(f'{scans} full table scan(s) found.')
+    if scans:
+        raise SystemExit(1)
+
+def _is_full_scan(detail):
+    """True if a plan step reads a whole table rather than an index, FTS match or subquery."""
+    # A bare "SCAN books" reads every row; "SCAN books USING INDEX ..." walks an index in order
+    match = re.match(r'SCAN (\w+)(?: |$)', detail)
+    if not match or 'USING' in detail or 'VIRTUAL TABLE' in detail:
+        return False
+    # Joined copies of a table are aliased books_1, users_2, ...
+    return re.sub(r'_\d+$', '', match.group(1)) in db.metadata.tables
+
+def _rolled_back(statements):
+    """Execute statements in a transaction that is rolled back, so their plans can be captured."""
+    with db.engine.connect() as connection:
+        with connection.begin() as transaction:
+            for statement in statements:
+                connection.execute(statement)
+            transaction.rollback()
+
+def _capture_statements(run):
+    """Run a callable and return the (statement, parameters) pairs it sent to the database."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        run()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+    return statements
@@ -0,0 +1,21 @@
+"""
+Database setup command for the book sharing application.
+"""
+import click
+
+from src.bootstrap import ensure_initial_invite
+
+@click.command('init-db')
+def init_db():
+    """Bring the schema up to date and create the initial invite code.
+    
+    Runs the migrations (the same as `flask db upgrade`), so it is safe to run
+    on every deploy; the INITIAL invite code is only added to a database that
+    has no invite codes yet.
+    """
+    from flask_migrate import upgrade
+    
+    upgrade()
+    if ensure_initial_invite():
+        click.echo('Created the INITIAL invite code for the first registration.')
+    click.echo('Database is ready.')
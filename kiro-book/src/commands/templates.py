@@ -0,0 +1,23 @@
+"""
+Template commands for the book sharing application.
+"""
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from src.template_cache import cache_directory, compile_templates
+
+templates_cli = AppGroup('templates', help='Template commands.')
+
+@templates_cli.command('compile')
+def compile_all():
+    """Precompile every template into the shared bytecode cache.
+    
+    Run on deploy, before the workers start, so none of them compiles a
+    template on its first requests. Needs TEMPLATE_BYTECODE_CACHE.
+    """
+    directory = cache_directory(current_app)
+    if directory is None:
+        raise click.ClickException('TEMPLATE_BYTECODE_CACHE is off; set it in the instance config first.')
+    names = compile_templates(current_app)
+    click.echo(f'{len(names)} template(s) compiled into {directory}.')
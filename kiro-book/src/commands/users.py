@@ -0,0 +1,58 @@
+"""
+User maintenance commands for the book sharing application.
+"""
+import click
+from flask.cli import AppGroup
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from src.extensions import db
+from src.models import UserStats
+from src.models.user_stats import STAT_COLUMNS, actual_user_stats
+
+users_cli = AppGroup('users', help='User account maintenance commands.')
+
+@users_cli.command('reconcile-stats')
+@click.option('--dry-run', is_flag=True, help='Report mismatches without fixing them.')
+def reconcile_stats(dry_run):
+    """Recompute the user_stats counters from books and borrowing_history.
+    
+    Upvotes received are summed from Book.upvote_count, so run
+    `flask books recount-upvotes` first if those may have drifted too.
+    """
+    actual = actual_user_stats().subquery()
+    stored = [getattr(UserStats, name) for name in STAT_COLUMNS]
+    rows = db.session.execute(
+        db.select(actual, *stored)
+        .outerjoin(UserStats, UserStats.user_id == actual.c.user_id)
+        .where(db.or_(UserStats.user_id.is_(None), *[
+            getattr(actual.c, name) != column for name, column in zip(STAT_COLUMNS, stored)
+        ]))
+    ).all()
+    
+    fixes = []
+    for row in rows:
+        user_id, counted = row[0], row[1:1 + len(STAT_COLUMNS)]
+        current = row[1 + len(STAT_COLUMNS):]
+        if current[0] is None:
+            click.echo(f'User {user_id}: no stats row')
+        else:
+            drift = ', '.join(
+                f'{name} {was} -> {now}' for name, was, now in zip(STAT_COLUMNS, current, counted) if was != now
+            )
+            click.echo(f'User {user_id}: {drift}')
+        fixes.append(dict(zip(('user_id', *STAT_COLUMNS), (user_id, *counted))))
+    
+    if fixes and not dry_run:
+        # Upsert only the mismatched rows, in one executemany batch
+        insert = sqlite_insert(UserStats.__table__)
+        db.session.execute(
+            insert.on_conflict_do_update(
+                index_elements=['user_id'],
+                set_={name: getattr(insert.excluded, name) for name in STAT_COLUMNS}
+            ),
+            fixes
+        )
+        db.session.commit()
+    
+    action = 'found' if dry_run else 'fixed'
+    click.echo(f'{len(fixes)} user(s) with mismatched stats {action}.')
@@ -0,0 +1,57 @@
+"""
+Conditional GET support for the book sharing application.
+
+Catalog and profile pages are tagged with a strong ETag and a Last-Modified
+date taken from CatalogVersion. A client or CDN revalidating an unchanged page
+gets a 304 straight away, before the listing query runs or any template is
+rendered.
+"""
+import hashlib
+from functools import wraps
+
+from flask import current_app, make_response, request, session
+from flask_login import current_user
+from werkzeug.http import is_resource_modified
+
+from src.models import CatalogVersion
+
+def page_etag(version, viewer):
+    """Strong ETag for the current URL as seen by viewer at a catalog version."""
+    key = f'{request.full_path}|{version}|{viewer}'
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def _cache_headers(response, etag, last_modified, authenticated):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Always revalidate; pages for logged-in users must not be shared by caches
+    response.headers['Cache-Control'] = 'private, no-cache' if authenticated else 'no-cache'
+    response.vary.add('Cookie')
+    return response
+
+def conditional_page(view):
+    """Answer If-None-Match / If-Modified-Since with 304 when the catalog hasn't changed.
+
+    The page's ETag covers the URL (so the view and filters), the catalog
+    version and the logged-in user, since the navbar and some empty-state
+    messages depend on who is viewing.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # A pending flash message makes this render one-off
+        if '_flashes' in session:
+            return view(*args, **kwargs)
+
+        version, last_modified = CatalogVersion.current()
+        authenticated = current_user.is_authenticated
+        etag = page_etag(version, current_user.get_id() if authenticated else 'anonymous')
+
+        if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+            response = current_app.response_class(status=304)
+            return _cache_headers(response, etag, last_modified, authenticated)
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            _cache_headers(response, etag, last_modified, authenticated)
+        return response
+    return wrapper
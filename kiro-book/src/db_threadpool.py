@@ -0,0 +1,69 @@
+"""
+Gevent-cooperative database access for the book sharing application.
+
+Under gunicorn's gevent worker every request is a greenlet on one OS thread,
+and pysqlite's calls are blocking C calls: a slow query, or a write waiting
+out busy_timeout, stalls every other request in that worker. When gevent has
+monkey-patched the process, each statement is instead executed on a small
+pool of native threads while the calling greenlet yields to the hub. pysqlite
+releases the GIL while SQLite works, so other greenlets keep being served.
+
+Only the DBAPI execute calls move to the pool; sessions, connection pooling
+and everything else stays on the greenlet. DB_THREADPOOL_SIZE in the instance
+config sets the pool size (default 4); 0 keeps execution on the hub.
+"""
+import os
+import sys
+
+from sqlalchemy import event
+
+from src.extensions import db
+
+class StatementThreadPool:
+    """A gevent ThreadPool created lazily in each worker process."""
+
+    def __init__(self, size):
+        self.size = size
+        self._pool = None
+        self._pid = None
+
+    @property
+    def active(self):
+        # gunicorn's gevent worker patches after the app is preloaded, so check per call
+        monkey = sys.modules.get('gevent.monkey')
+        return self.size > 0 and monkey is not None and monkey.is_module_patched('socket')
+
+    def apply(self, function, *args):
+        """Run function(*args) on a native thread, blocking only the current greenlet."""
+        if self._pid != os.getpid():
+            # Threads don't survive fork, so each worker builds its own pool
+            from gevent.threadpool import ThreadPool
+            self._pool = ThreadPool(self.size)
+            self._pid = os.getpid()
+        return self._pool.apply(function, args)
+
+def init_db_threadpool(app):
+    """Route the app engine's statement execution through a thread pool under gevent."""
+    pool = StatementThreadPool(app.config.get('DB_THREADPOOL_SIZE', 4))
+    app.extensions['db_threadpool'] = pool
+    with app.app_context():
+        engine = db.engine
+
+    # Returning True tells SQLAlchemy the statement has been executed
+    @event.listens_for(engine, 'do_execute')
+    def execute(cursor, statement, parameters, context):
+        if pool.active:
+            pool.apply(cursor.execute, statement, parameters)
+            return True
+
+    @event.listens_for(engine, 'do_execute_no_params')
+    def execute_no_params(cursor, statement, context):
+        if pool.active:
+            pool.apply(cursor.execute, statement)
+            return True
+
+    @event.listens_for(engine, 'do_executemany')
+    def executemany(cursor, statement, parameters, context):
+        if pool.active:
+            pool.apply(cursor.executemany, statement, parameters)
+            return True
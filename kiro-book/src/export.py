@@ -0,0 +1,102 @@
+"""
+Streaming exports for the book sharing application.
+
+Exports are generated row by row from queries run with yield_per, so memory
+stays flat no matter how many rows are written, and the response starts
+before the last row is read. Rows can be written as CSV or as NDJSON (one
+JSON object per line); the header line goes out as soon as the export
+starts.
+"""
+import csv
+import io
+import json
+
+from flask import Response, stream_with_context
+
+from src.extensions import db
+from src.models import Book, User
+
+# Rows fetched from the database per batch
+YIELD_PER = 500
+
+# Buffered output is sent once it grows past this many characters
+CHUNK_SIZE = 16 * 1024
+
+def iter_csv(header, rows):
+    """Yield CSV text for header and rows in chunks of roughly CHUNK_SIZE."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def iter_ndjson(header, rows):
+    """Yield one JSON object per row, keyed by header, in chunks of roughly CHUNK_SIZE."""
+    lines = []
+    size = 0
+    for row in rows:
+        line = json.dumps(dict(zip(header, row)), default=str)
+        lines.append(line)
+        size += len(line) + 1
+        if size >= CHUNK_SIZE:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+            size = 0
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+# Export format -> (file extension, mimetype, writer)
+FORMATS = {
+    'csv': ('csv', 'text/csv', iter_csv),
+    'ndjson': ('ndjson', 'application/x-ndjson', iter_ndjson),
+}
+
+def export_response(name, file_format, header, rows):
+    """Stream rows as a name.csv or name.ndjson attachment, keeping the request context for lazy queries."""
+    extension, mimetype, writer = FORMATS[file_format]
+    return Response(
+        stream_with_context(writer(header, rows)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={name}.{extension}'}
+    )
+
+CATALOG_HEADER = ('book_id', 'title', 'author', 'isbn', 'purchase_url', 'rating', 'fiction',
+                  'available', 'upvotes', 'comments', 'created_at', 'owner')
+
+def catalog_export(include_hidden=False, owner_emails=False):
+    """
+    (header, rows) for the catalog in book_id order, read in YIELD_PER batches.
+    
+    Rows have the columns `flask books import` reads, so an export with
+    owner_emails (which replaces the owner's alias) can be imported again.
+    Emails are only for the CLI; the web export names owners by alias.
+    """
+    header = CATALOG_HEADER[:-1] + (('owner_email',) if owner_emails else ('owner',))
+    statement = (
+        db.select(Book.book_id, Book.title, Book.author, Book.isbn, Book.purchase_url,
+                  Book.recommendation_rating, Book.is_fiction, Book.is_available,
+                  Book.upvote_count, Book.comment_count, Book.created_at,
+                  User.email if owner_emails else User.alias)
+        .join(User, User.user_id == Book.owner_id)
+        .order_by(Book.book_id)
+    )
+    if not include_hidden:
+        statement = statement.where(Book.is_hidden == False)
+    
+    def rows():
+        for row in db.session.execute(statement.execution_options(yield_per=YIELD_PER)):
+            (book_id, title, author, isbn, purchase_url, rating, is_fiction, is_available,
+             upvotes, comments, created_at, owner) = row
+            yield (book_id, title, author, isbn, purchase_url, rating,
+                   'fiction' if is_fiction else 'non-fiction', is_available,
+                   upvotes, comments, created_at.isoformat(), owner)
+    
+    return header, rows()
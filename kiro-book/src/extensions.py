@@ -1,16 +1,15 @@
 """
 Extensions module for Flask application.
 This module initializes Flask extensions used throughout the application.
+Flask-Migrate is set up by create_app only for the `flask` command.
 """
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
-from flask_migrate import Migrate
 from flask_wtf.csrf import CSRFProtect
 
 # Initialize extensions
 db = SQLAlchemy()
 login_manager = LoginManager()
-migrate = Migrate()
 csrf = CSRFProtect()
 
 # Configure login manager
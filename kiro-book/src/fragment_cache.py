@@ -0,0 +1,86 @@
+"""
+Rendered book card cache for the book sharing application.
+
+Listing pages render the same book cards over and over. Each card's HTML is
+cached per worker in a bounded LRU keyed by (template, book_id) and stamped
+with a version built from the row data the card shows. The version comes from
+columns the listing query has already loaded (updated_at moves on every ORM
+edit of the book, upvote_count and comment_count on every upvote and comment,
+and the owner and borrower aliases are joined in), so a change made by any
+gunicorn worker invalidates the card in every worker without extra queries or
+cross-process signalling.
+"""
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+from markupsafe import Markup
+
+class FragmentCache:
+    """A bounded LRU of rendered fragments with hit/miss counters."""
+
+    def __init__(self, maxsize=2048):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key, version, render):
+        """Return the cached fragment for key if its version matches, else render and store it."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        html = render()
+        if self.maxsize > 0:
+            with self._lock:
+                # Replaces any stale version of the same card in place
+                self._entries[key] = (version, html)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return html
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0,
+        }
+
+def card_version(book):
+    """Everything a book card displays that can change after the book is created."""
+    return (
+        book.updated_at,
+        book.upvote_count,
+        book.comment_count,
+        book.owner.alias,
+        book.borrower.alias if book.current_borrower_id else None,
+    )
+
+def cached_card(template_name, book):
+    """Template global: render a book card partial through the card cache."""
+    cache = current_app.extensions['card_cache']
+    template = current_app.jinja_env.get_template(template_name)
+    return cache.get_or_render(
+        (template_name, book.book_id),
+        card_version(book),
+        lambda: Markup(template.render(book=book))
+    )
+
+def init_fragment_cache(app):
+    """Create the per-worker card cache; CARD_CACHE_SIZE = 0 disables caching."""
+    app.extensions['card_cache'] = FragmentCache(app.config.get('CARD_CACHE_SIZE', 2048))
+    app.add_template_global(cached_card)
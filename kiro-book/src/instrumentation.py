@@ -0,0 +1,118 @@
+"""
+Per-request SQL instrumentation for the book sharing application.
+
+When SQL_INSTRUMENTATION is set in the instance config, every response gets a
+Server-Timing header with the request's query count and database time, the
+time spent rendering templates and the total, which browser dev tools show
+under the request's Timing tab:
+
+    Server-Timing: db;dur=12.4;desc="7 queries", tpl;dur=3.1, total;dur=18.9
+
+Statements slower than SLOW_QUERY_MS (default 100) are logged as warnings to
+the src.instrumentation logger with the route and normalized SQL, and also
+appended to SLOW_QUERY_LOG if that names a file. With instrumentation off
+nothing is registered, so it costs nothing.
+"""
+import logging
+import re
+import time
+
+from flask import before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+
+from src.extensions import db
+
+logger = logging.getLogger(__name__)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r'\s+')
+_PLACEHOLDER_LISTS = re.compile(r'\(\?(?:, \?)+\)')
+
+def normalize_sql(statement):
+    """Collapse whitespace and replace literals and placeholder lists so similar statements compare equal."""
+    sql = _WHITESPACE.sub(' ', _LITERALS.sub('?', statement)).strip()
+    return _PLACEHOLDER_LISTS.sub('(?, ...)', sql)
+
+class RequestTimings:
+    """Query count and accumulated times for one request, kept on g."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_starts = []
+
+    def header(self):
+        total = time.perf_counter() - self.started
+        return (
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries", '
+            f'tpl;dur={self.template_time * 1000:.1f}, '
+            f'total;dur={total * 1000:.1f}'
+        )
+
+def _timings():
+    return g.get('_request_timings') if has_request_context() else None
+
+def init_instrumentation(app):
+    """Record per-request query and template timings when SQL_INSTRUMENTATION is on."""
+    if not app.config.get('SQL_INSTRUMENTATION', False):
+        return
+
+    slow_query_seconds = app.config.get('SLOW_QUERY_MS', 100) / 1000
+    log_file = app.config.get('SLOW_QUERY_LOG')
+    if log_file and not any(getattr(handler, 'baseFilename', None) == log_file for handler in logger.handlers):
+        handler = logging.FileHandler(log_file)
+        handler.setFormatter(logging.Formatter('%(asctime)s %(process)d %(message)s'))
+        logger.addHandler(handler)
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_query(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def end_query(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_started'].pop()
+        timings = _timings()
+        if timings is not None:
+            timings.queries += 1
+            timings.db_time += elapsed
+        if elapsed >= slow_query_seconds:
+            route = request.endpoint if has_request_context() else None
+            logger.warning('slow query %.1f ms [%s] %s', elapsed * 1000, route or '-', normalize_sql(statement))
+
+    @event.listens_for(engine, 'handle_error')
+    def discard_query(exception_context):
+        started = exception_context.connection.info.get('query_started') if exception_context.connection else None
+        if started:
+            started.pop()
+
+    @app.before_request
+    def start_request():
+        g._request_timings = RequestTimings()
+
+    @app.after_request
+    def add_server_timing(response):
+        timings = _timings()
+        if timings is not None:
+            response.headers.add('Server-Timing', timings.header())
+        return response
+
+    def start_template(sender, template, context, **extra):
+        timings = _timings()
+        if timings is not None:
+            timings.template_starts.append(time.perf_counter())
+
+    def end_template(sender, template, context, **extra):
+        timings = _timings()
+        if timings is not None and timings.template_starts:
+            elapsed = time.perf_counter() - timings.template_starts.pop()
+            # Only count the outermost render so nested render_template calls aren't counted twice
+            if not timings.template_starts:
+                timings.template_time += elapsed
+
+    before_render_template.connect(start_template, app, weak=False)
+    template_rendered.connect(end_template, app, weak=False)
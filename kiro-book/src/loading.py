@@ -0,0 +1,77 @@
+"""
+Eager-loading profiles for the book sharing application.
+
+Each listing route applies one of these profiles so a page costs a fixed
+number of queries no matter how many rows it shows. In debug mode (or when
+ASSERT_NO_LAZY_LOADS is set) any lazy load that fires while a template is
+rendering raises an AssertionError naming the relationship to preload.
+"""
+from flask import g, has_app_context, before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload, contains_eager, configure_mappers
+
+from src.extensions import db
+from src.models import Book, BookComment, BorrowRequest, BorrowingHistory
+
+# Backref attributes such as Book.owner only exist once the mappers are configured
+configure_mappers()
+
+# Dashboard and book index cards: "Shared by" and "by <borrower>"
+BOOK_CARDS = (joinedload(Book.owner), joinedload(Book.borrower))
+
+# profile.books table: borrower alias only, the owner is the current user
+OWNED_BOOKS = (joinedload(Book.borrower),)
+
+# profile.borrowed table: owner alias only
+BORROWED_BOOKS = (joinedload(Book.owner),)
+
+# books.view: owner card, borrower line and each comment's author
+BOOK_DETAIL = (joinedload(Book.owner), joinedload(Book.borrower))
+BOOK_COMMENTS = (joinedload(BookComment.user),)
+
+# profile.history "Books I've Borrowed": book title and its owner
+BORROWED_HISTORY = (joinedload(BorrowingHistory.book).joinedload(Book.owner),)
+
+# profile.history "Books I've Lent Out": the route already joins books
+LENT_HISTORY = (contains_eager(BorrowingHistory.book), joinedload(BorrowingHistory.borrower))
+
+# profile.requests "My Borrow Requests": book title and its owner
+OUTGOING_REQUESTS = (joinedload(BorrowRequest.book).joinedload(Book.owner),)
+
+# profile.requests "Incoming Requests": the route already joins books
+INCOMING_REQUESTS = (contains_eager(BorrowRequest.book), joinedload(BorrowRequest.requester))
+
+def init_lazy_load_guard(app):
+    """Flag lazy loads that fire during template rendering."""
+    before_render_template.connect(_enter_template, app)
+    template_rendered.connect(_leave_template, app)
+
+    # The session listener is process-wide, so only attach it once
+    if not event.contains(db.session, 'do_orm_execute', _check_lazy_load):
+        event.listen(db.session, 'do_orm_execute', _check_lazy_load)
+
+def _guard_enabled(app):
+    return app.config.get('ASSERT_NO_LAZY_LOADS', app.debug)
+
+def _enter_template(app, template, context, **extra):
+    if _guard_enabled(app):
+        g.setdefault('_rendering_templates', []).append(template.name)
+
+def _leave_template(app, template, context, **extra):
+    stack = g.get('_rendering_templates')
+    if stack:
+        stack.pop()
+
+def _check_lazy_load(orm_execute_state):
+    if not orm_execute_state.is_select or not has_app_context():
+        return
+    if orm_execute_state.lazy_loaded_from is None:
+        return
+    stack = g.get('_rendering_templates')
+    if stack:
+        path = orm_execute_state.loader_strategy_path
+        attribute = path[-1] if path else orm_execute_state.lazy_loaded_from.class_.__name__
+        raise AssertionError(
+            f'Lazy load of {attribute} fired while rendering {stack[-1]}; '
+            f'add an eager loader for it to the route query.'
+        )
@@ -7,4 +7,8 @@ from src.models.book_comment import BookComment
 from src.models.borrowing_history import BorrowingHistory
 from src.models.invite_code import InviteCode
 from src.models.book_upvote import BookUpvote
-from src.models.borrow_request import BorrowRequest
\ No newline at end of file
+from src.models.borrow_request import BorrowRequest
+from src.models.catalog_version import CatalogVersion
+from src.models.upvote_journal import UpvoteJournal
+from src.models.user_stats import UserStats
+from src.models.import_progress import ImportProgress
@@ -2,9 +2,12 @@
 Book model for the book sharing application.
 """
 from datetime import datetime
+from sqlalchemy import DDL, event, literal
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from src.extensions import db
 from src.models.book_upvote import BookUpvote
+from src.sqlite_tuning import begin_write
 
 class Book(db.Model):
     __tablename__ = 'books'
@@ -20,9 +23,25 @@ class Book(db.Model):
     is_hidden = db.Column(db.Boolean, nullable=False, default=False)
     is_fiction = db.Column(db.Boolean, nullable=False, default=True)
     current_borrower_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='SET NULL'), nullable=True)
+    upvote_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Denormalized from book_upvotes
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Kept by book_comments triggers
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Dashboard and book index: public books newest first, optionally filtered
+        db.Index('ix_books_public_created', 'created_at', 'book_id',
+                 sqlite_where=db.text('is_hidden = 0')),
+        db.Index('ix_books_public_fiction_created', 'is_fiction', 'created_at', 'book_id',
+                 sqlite_where=db.text('is_hidden = 0')),
+        db.Index('ix_books_public_available_created', 'is_available', 'created_at', 'book_id',
+                 sqlite_where=db.text('is_hidden = 0')),
+        # Profile pages: a user's books (and their available ones) and books they borrow
+        db.Index('ix_books_owner_available', 'owner_id', 'is_available'),
+        db.Index('ix_books_current_borrower', 'current_borrower_id',
+                 sqlite_where=db.text('current_borrower_id IS NOT NULL')),
+    )
+    
     # Relationships
     comments = db.relationship('BookComment', backref='book', lazy='dynamic', cascade='all, delete-orphan')
     upvotes = db.relationship('BookUpvote', backref='book', lazy='dynamic', cascade='all, delete-orphan')
@@ -39,25 +58,90 @@ class Book(db.Model):
         self.is_available = True
         self.is_hidden = False
         self.is_fiction = is_fiction
+        self.upvote_count = 0
+        self.comment_count = 0
         
     def __repr__(self):
         return f'<Book {self.title} by {self.author}>'
         
-    @property
-    def upvote_count(self):
-        return self.upvotes.count()
-        
     def is_upvoted_by(self, user_id):
         return self.upvotes.filter_by(user_id=user_id).first() is not None
         
-    def toggle_upvote(self, user_id):
-        existing_upvote = self.upvotes.filter_by(user_id=user_id).first()
-        if existing_upvote:
-            db.session.delete(existing_upvote)
-            db.session.commit()
-            return False
-        else:
-            new_upvote = BookUpvote(book_id=self.book_id, user_id=user_id)
-            db.session.add(new_upvote)
-            db.session.commit()
-            return True
\ No newline at end of file
+    @classmethod
+    def toggle_upvote(cls, book_id, user_id):
+        """
+        Toggle user_id's upvote on a book and commit.
+
+        Returns (upvoted, upvote_count) with the count read back from the
+        counter update itself, or None if the book doesn't exist. The toggle
+        is a single DELETE ... RETURNING or INSERT ... ON CONFLICT DO NOTHING,
+        and the counter only moves when that statement changed a row, so
+        concurrent toggles (double clicks included) can't raise IntegrityError
+        or let upvote_count drift.
+        """
+        upvotes = BookUpvote.__table__
+        books = cls.__table__
+        
+        begin_write()
+        removed = db.session.execute(
+            upvotes.delete()
+            .where(upvotes.c.book_id == book_id, upvotes.c.user_id == user_id)
+            .returning(upvotes.c.upvote_id)
+        ).first()
+        
+        if removed is None:
+            # Insert only if the book exists; the WHERE also keeps SQLite from
+            # reading ON CONFLICT as a join constraint
+            added = db.session.execute(
+                sqlite_insert(upvotes)
+                .from_select(
+                    ['book_id', 'user_id', 'created_at'],
+                    db.select(books.c.book_id, literal(user_id), literal(datetime.utcnow(), db.DateTime))
+                    .where(books.c.book_id == book_id)
+                )
+                .on_conflict_do_nothing(index_elements=['book_id', 'user_id'])
+                .returning(upvotes.c.upvote_id)
+            ).first()
+            if added is None:
+                db.session.rollback()
+                return None
+        
+        # Keep updated_at as-is: an upvote is not an edit of the book itself
+        upvote_count = db.session.execute(
+            db.update(books)
+            .where(books.c.book_id == book_id)
+            .values(upvote_count=books.c.upvote_count + (-1 if removed else 1), updated_at=books.c.updated_at)
+            .returning(books.c.upvote_count)
+        ).scalar_one()
+        db.session.commit()
+        return removed is None, upvote_count
+
+# Full-text index over title, author and ISBN for /books/search. It reads its
+# text from the books table (external content) and is kept in sync by triggers,
+# so every write path, including raw SQL, updates it. Statements are idempotent
+# so `flask books reindex-search` can re-run them on an existing database.
+BOOKS_FTS_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+        title, author, isbn,
+        content='books', content_rowid='book_id',
+        tokenize='unicode61 remove_diacritics 2', prefix='3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN
+        INSERT INTO books_fts(rowid, title, author, isbn)
+        VALUES (new.book_id, new.title, new.author, new.isbn);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN
+        INSERT INTO books_fts(books_fts, rowid, title, author, isbn)
+        VALUES ('delete', old.book_id, old.title, old.author, old.isbn);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, author, isbn ON books BEGIN
+        INSERT INTO books_fts(books_fts, rowid, title, author, isbn)
+        VALUES ('delete', old.book_id, old.title, old.author, old.isbn);
+        INSERT INTO books_fts(rowid, title, author, isbn)
+        VALUES (new.book_id, new.title, new.author, new.isbn);
+    END""",
+)
+
+for statement in BOOKS_FTS_DDL:
+    event.listen(Book.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+event.listen(Book.__table__, 'before_drop', DDL('DROP TABLE IF EXISTS books_fts').execute_if(dialect='sqlite'))
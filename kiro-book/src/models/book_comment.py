@@ -2,6 +2,7 @@
 BookComment model for the book sharing application.
 """
 from datetime import datetime
+from sqlalchemy import DDL, event
 
 from src.extensions import db
 
@@ -14,10 +15,29 @@ class BookComment(db.Model):
     comment_text = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
+    __table_args__ = (
+        # Comment thread on the book page, in posting order
+        db.Index('ix_book_comments_book_created', 'book_id', 'created_at'),
+    )
+    
     def __init__(self, book_id, user_id, comment_text):
         self.book_id = book_id
         self.user_id = user_id
         self.comment_text = comment_text
         
     def __repr__(self):
-        return f'<BookComment {self.comment_id}>'
\ No newline at end of file
+        return f'<BookComment {self.comment_id}>'
+
+# Books.comment_count follows every comment insert and delete, including
+# cascades, without the routes having to remember it
+COMMENT_COUNT_DDL = (
+    """CREATE TRIGGER IF NOT EXISTS book_comments_count_ai AFTER INSERT ON book_comments BEGIN
+        UPDATE books SET comment_count = comment_count + 1 WHERE book_id = new.book_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS book_comments_count_ad AFTER DELETE ON book_comments BEGIN
+        UPDATE books SET comment_count = comment_count - 1 WHERE book_id = old.book_id;
+    END""",
+)
+
+for statement in COMMENT_COUNT_DDL:
+    event.listen(BookComment.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
@@ -4,6 +4,7 @@ BorrowRequest model for the book sharing application.
 from datetime import datetime
 
 from src.extensions import db
+from src.sqlite_tuning import begin_write
 
 class BorrowRequest(db.Model):
     __tablename__ = 'borrow_requests'
@@ -15,6 +16,12 @@ class BorrowRequest(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Pending-request lookups by book and requester, and a book's pending requests
+        db.Index('ix_borrow_requests_book_requester_status', 'book_id', 'requester_id', 'status'),
+        db.Index('ix_borrow_requests_requester', 'requester_id'),
+    )
+    
     # Relationships
     requester = db.relationship('User', backref=db.backref('borrow_requests', lazy='dynamic'))
     
@@ -29,4 +36,54 @@ class BorrowRequest(db.Model):
         self.status = 'approved'
         
     def deny(self):
-        self.status = 'denied'
\ No newline at end of file
+        self.status = 'denied'
+        
+    @classmethod
+    def approval_statements(cls, request_id, book_id, requester_id):
+        """
+        The statements approve_and_lend runs, in order: lend the book if it is
+        available, approve the request if it is pending, reject the book's
+        other pending requests and record the loan.
+        """
+        from src.models.book import Book
+        from src.models.borrowing_history import BorrowingHistory
+        requests = cls.__table__
+        books = Book.__table__
+        return (
+            db.update(books)
+            .where(books.c.book_id == book_id, books.c.is_available.is_(True))
+            .values(is_available=False, current_borrower_id=requester_id),
+            db.update(requests)
+            .where(requests.c.request_id == request_id, requests.c.status == 'pending')
+            .values(status='approved'),
+            db.update(requests)
+            .where(requests.c.book_id == book_id, requests.c.status == 'pending')
+            .values(status='rejected'),
+            db.insert(BorrowingHistory.__table__).values(book_id=book_id, borrower_id=requester_id),
+        )
+    
+    @classmethod
+    def approve_and_lend(cls, request_id, book_id, requester_id):
+        """
+        Approve a pending request, lend the book and reject the book's other
+        pending requests in one transaction, then commit.
+
+        Returns the number of requests rejected along the way, or None (after
+        rolling back) if the book was lent out or the request answered in the
+        meantime. Every step is a single conditional UPDATE, so two approvals
+        racing for the same book can't both lend it.
+        """
+        lend, approve, reject_others, record_loan = cls.approval_statements(request_id, book_id, requester_id)
+        
+        # The checks and writes below must not interleave with another writer
+        begin_write()
+        lent = db.session.execute(lend).rowcount
+        approved = db.session.execute(approve).rowcount
+        if not (lent and approved):
+            db.session.rollback()
+            return None
+        
+        rejected = db.session.execute(reject_others).rowcount
+        db.session.execute(record_loan)
+        db.session.commit()
+        return rejected
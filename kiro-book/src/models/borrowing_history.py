@@ -3,6 +3,8 @@ BorrowingHistory model for the book sharing application.
 """
 from datetime import datetime
 
+from sqlalchemy import func, literal, union_all
+
 from src.extensions import db
 
 class BorrowingHistory(db.Model):
@@ -14,6 +16,13 @@ class BorrowingHistory(db.Model):
     borrow_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     return_date = db.Column(db.DateTime, nullable=True)
     
+    __table_args__ = (
+        # Open-loan lookup on return, and a book's history for the lent-out tab
+        db.Index('ix_borrowing_history_book_borrower_return', 'book_id', 'borrower_id', 'return_date'),
+        # A user's borrowed tab, newest first, one page at a time
+        db.Index('ix_borrowing_history_borrower_date', 'borrower_id', 'borrow_date', 'borrow_id'),
+    )
+    
     # Relationship with borrower
     borrower = db.relationship('User', backref=db.backref('borrowing_history', lazy='dynamic'))
     
@@ -26,4 +35,29 @@ class BorrowingHistory(db.Model):
         
     def mark_returned(self):
         from datetime import timezone
-        self.return_date = datetime.now(timezone.utc)
\ No newline at end of file
+        self.return_date = datetime.now(timezone.utc)
+        
+    @classmethod
+    def summary_for(cls, user_id):
+        """
+        Return (lent, borrowed, average_loan_days) for a user's history in one query.
+
+        average_loan_days covers returned loans in either direction and is
+        None until one has been returned.
+        """
+        from src.models.book import Book
+        loan_days = func.julianday(cls.return_date) - func.julianday(cls.borrow_date)
+        loans = union_all(
+            db.select(literal('borrowed').label('role'), loan_days.label('days'))
+            .where(cls.borrower_id == user_id),
+            db.select(literal('lent'), loan_days)
+            .join(Book, Book.book_id == cls.book_id)
+            .where(Book.owner_id == user_id)
+        ).subquery()
+        return db.session.execute(
+            db.select(
+                func.count().filter(loans.c.role == 'lent').label('lent'),
+                func.count().filter(loans.c.role == 'borrowed').label('borrowed'),
+                func.avg(loans.c.days).label('average_loan_days')
+            )
+        ).one()
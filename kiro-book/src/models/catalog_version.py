@@ -0,0 +1,46 @@
+"""
+CatalogVersion model for the book sharing application.
+"""
+from datetime import datetime
+from sqlalchemy import DDL, event
+
+from src.extensions import db
+
+class CatalogVersion(db.Model):
+    """A change counter for everything the public listing pages show.
+    
+    SQLite triggers bump the single 'catalog' row whenever a book is inserted,
+    updated (including its upvote_count) or deleted, or a user's alias or bio
+    changes, so reading it is one primary-key lookup for any worker.
+    """
+    __tablename__ = 'catalog_versions'
+    
+    name = db.Column(db.String(20), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<CatalogVersion {self.name} {self.version}>'
+    
+    @classmethod
+    def current(cls):
+        """Return (version, updated_at) for the catalog, or (0, None) if untracked."""
+        row = db.session.execute(
+            db.select(cls.version, cls.updated_at).where(cls.name == 'catalog')
+        ).first()
+        return tuple(row) if row else (0, None)
+
+_BUMP = "UPDATE catalog_versions SET version = version + 1, updated_at = datetime('now') WHERE name = 'catalog';"
+
+# Idempotent so they can be re-run against an existing database
+CATALOG_VERSION_DDL = (
+    "INSERT OR IGNORE INTO catalog_versions (name, version, updated_at) VALUES ('catalog', 0, datetime('now'))",
+    f"CREATE TRIGGER IF NOT EXISTS catalog_version_books_ai AFTER INSERT ON books BEGIN {_BUMP} END",
+    f"CREATE TRIGGER IF NOT EXISTS catalog_version_books_au AFTER UPDATE ON books BEGIN {_BUMP} END",
+    f"CREATE TRIGGER IF NOT EXISTS catalog_version_books_ad AFTER DELETE ON books BEGIN {_BUMP} END",
+    f"CREATE TRIGGER IF NOT EXISTS catalog_version_users_au AFTER UPDATE OF alias, bio ON users BEGIN {_BUMP} END",
+)
+
+# The triggers reference books and users, so install them once every table exists
+for statement in CATALOG_VERSION_DDL:
+    event.listen(db.metadata, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
@@ -0,0 +1,23 @@
+"""
+ImportProgress model for the book sharing application.
+"""
+from datetime import datetime
+
+from src.extensions import db
+
+class ImportProgress(db.Model):
+    """How far `flask books import` got through one source file.
+    
+    The row is written in the same transaction as each batch of books, so a
+    resumed import never inserts a committed batch twice.
+    """
+    __tablename__ = 'import_progress'
+    
+    source = db.Column(db.String(1024), primary_key=True)  # Absolute path of the import file
+    records = db.Column(db.Integer, nullable=False, default=0)  # Records read, imported or rejected
+    imported = db.Column(db.Integer, nullable=False, default=0)
+    rejected = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ImportProgress {self.source} {self.records}>'
@@ -0,0 +1,140 @@
+"""
+UpvoteJournal model for the book sharing application.
+"""
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import bindparam, case, exists, func, tuple_
+
+from src.extensions import db
+from src.models.book import Book
+from src.models.book_upvote import BookUpvote
+from src.sqlite_tuning import begin_write
+
+class UpvoteJournal(db.Model):
+    """Upvote toggles accepted but not yet applied to book_upvotes (UPVOTE_QUEUE mode)."""
+    __tablename__ = 'upvote_journal'
+
+    entry_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    book_id = db.Column(db.Integer, db.ForeignKey('books.book_id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Pending toggles for one book, per user, for read-your-writes responses
+        db.Index('ix_upvote_journal_book_user', 'book_id', 'user_id'),
+    )
+
+    def __repr__(self):
+        return f'<UpvoteJournal {self.entry_id} book={self.book_id} user={self.user_id}>'
+
+    @classmethod
+    def record_toggle(cls, book_id, user_id):
+        """
+        Journal a toggle and commit.
+
+        Returns (upvoted, upvote_count) as the user will see them once every
+        pending toggle is applied, or None if the book doesn't exist.
+        """
+        journal = cls.__table__
+        upvotes = BookUpvote.__table__
+        books = Book.__table__
+
+        begin_write()
+        db.session.execute(journal.insert().values(book_id=book_id, user_id=user_id, created_at=datetime.utcnow()))
+
+        # Per user with pending toggles on this book: do they flip the upvote, and is it there now?
+        pending = (
+            db.select(
+                journal.c.user_id,
+                (func.count() % 2).label('flipped'),
+                exists().where(upvotes.c.book_id == book_id, upvotes.c.user_id == journal.c.user_id).label('committed'),
+            )
+            .where(journal.c.book_id == book_id)
+            .group_by(journal.c.user_id)
+            .cte('pending')
+        )
+        pending_delta = db.select(func.coalesce(func.sum(
+            case((pending.c.flipped == 0, 0), (pending.c.committed, -1), else_=1)
+        ), 0)).scalar_subquery()
+        upvoted = (
+            db.select((pending.c.committed + pending.c.flipped) % 2)
+            .where(pending.c.user_id == user_id)
+            .scalar_subquery()
+        )
+        row = db.session.execute(
+            db.select(books.c.upvote_count + pending_delta, upvoted).where(books.c.book_id == book_id)
+        ).first()
+
+        if row is None:
+            db.session.rollback()
+            return None
+        db.session.commit()
+        return bool(row[1]), row[0]
+
+    @classmethod
+    def flush(cls, batch_size=1000):
+        """
+        Apply up to batch_size journal entries in one transaction and commit.
+
+        Entries are claimed with DELETE ... RETURNING, so concurrent flushers in
+        other workers never apply the same toggle twice. Toggles by the same
+        user on the same book are folded: only an odd number changes anything.
+        Returns the number of entries consumed.
+        """
+        journal = cls.__table__
+        upvotes = BookUpvote.__table__
+        books = Book.__table__
+
+        claimed = db.session.execute(
+            journal.delete()
+            .where(journal.c.entry_id.in_(
+                db.select(journal.c.entry_id).order_by(journal.c.entry_id).limit(batch_size)
+            ))
+            .returning(journal.c.book_id, journal.c.user_id)
+        ).all()
+        if not claimed:
+            db.session.rollback()
+            return 0
+
+        flips = [pair for pair, toggles in Counter(tuple(row) for row in claimed).items() if toggles % 2]
+        if flips:
+            existing = set(tuple(row) for row in db.session.execute(
+                db.select(upvotes.c.book_id, upvotes.c.user_id)
+                .where(tuple_(upvotes.c.book_id, upvotes.c.user_id).in_(flips))
+            ))
+            live_books = set(db.session.scalars(
+                db.select(books.c.book_id).where(books.c.book_id.in_({book_id for book_id, _ in flips}))
+            ))
+            removals = [pair for pair in flips if pair in existing]
+            additions = [pair for pair in flips if pair not in existing and pair[0] in live_books]
+
+            if removals:
+                db.session.execute(
+                    upvotes.delete().where(
+                        upvotes.c.book_id == bindparam('b_book_id'),
+                        upvotes.c.user_id == bindparam('b_user_id')
+                    ),
+                    [{'b_book_id': book_id, 'b_user_id': user_id} for book_id, user_id in removals]
+                )
+            if additions:
+                now = datetime.utcnow()
+                db.session.execute(
+                    upvotes.insert(),
+                    [{'book_id': book_id, 'user_id': user_id, 'created_at': now} for book_id, user_id in additions]
+                )
+
+            deltas = Counter(book_id for book_id, _ in additions)
+            deltas.subtract(book_id for book_id, _ in removals)
+            changed = [{'b_book_id': book_id, 'b_delta': delta} for book_id, delta in deltas.items() if delta]
+            if changed:
+                # One counter update per book, however many toggles it received
+                db.session.execute(
+                    db.update(books)
+                    .where(books.c.book_id == bindparam('b_book_id'))
+                    .values(upvote_count=books.c.upvote_count + bindparam('b_delta'), updated_at=books.c.updated_at),
+                    changed
+                )
+
+        db.session.commit()
+        return len(claimed)
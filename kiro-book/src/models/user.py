@@ -2,15 +2,31 @@
 User model for the book sharing application.
 """
 from datetime import datetime
+from flask import current_app, has_app_context
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event, inspect
 import secrets
 
 from src.extensions import db, login_manager
+from src.passwords import password_hasher
+from src.user_cache import IDENTITY_COLUMNS, UserIdentity
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    """Return a detached UserIdentity, from the per-worker cache when possible."""
+    user_id = int(user_id)
+    cache = current_app.extensions.get('user_cache')
+    identity = cache.get(user_id) if cache is not None else None
+    if identity is None:
+        row = db.session.execute(
+            db.select(*[getattr(User, column) for column in IDENTITY_COLUMNS]).where(User.user_id == user_id)
+        ).first()
+        if row is None:
+            return None
+        identity = UserIdentity(**row._mapping)
+        if cache is not None:
+            cache.put(user_id, identity)
+    return identity
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
@@ -42,10 +58,14 @@ class User(UserMixin, db.Model):
         self.personal_invite_code = self.generate_invite_code()
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher().hash(password)
         
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher().verify(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        """True if the stored hash uses other parameters than PASSWORD_HASH_METHOD."""
+        return password_hasher().needs_rehash(self.password_hash)
     
     def generate_invite_code(self):
         return secrets.token_urlsafe(8)
@@ -54,4 +74,35 @@ class User(UserMixin, db.Model):
         return str(self.user_id)
     
     def __repr__(self):
-        return f'<User {self.email}>'
\ No newline at end of file
+        return f'<User {self.email}>'
+
+def _queue_eviction(target):
+    session = inspect(target).session
+    if session is not None:
+        session.info.setdefault('evict_user_ids', set()).add(target.user_id)
+
+def _user_updated(mapper, connection, target):
+    """Evict the user's cached identity once a flush changing one of its columns commits."""
+    state = inspect(target)
+    if any(state.attrs[column].history.has_changes() for column in IDENTITY_COLUMNS):
+        _queue_eviction(target)
+
+def _user_deleted(mapper, connection, target):
+    _queue_eviction(target)
+
+def _evict_committed_users(session):
+    # Evict only once the change is committed, so a concurrent request can't re-cache the old row
+    user_ids = session.info.pop('evict_user_ids', ())
+    if user_ids and has_app_context():
+        cache = current_app.extensions.get('user_cache')
+        if cache is not None:
+            for user_id in user_ids:
+                cache.invalidate(user_id)
+
+def _discard_evictions(session):
+    session.info.pop('evict_user_ids', None)
+
+event.listen(User, 'after_update', _user_updated)
+event.listen(User, 'after_delete', _user_deleted)
+event.listen(db.session, 'after_commit', _evict_committed_users)
+event.listen(db.session, 'after_rollback', _discard_evictions)
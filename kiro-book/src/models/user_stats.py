@@ -0,0 +1,115 @@
+"""
+UserStats model for the book sharing application.
+"""
+from sqlalchemy import DDL, event
+
+from src.extensions import db
+
+STAT_COLUMNS = ('books_owned', 'books_lent_out', 'books_borrowed', 'upvotes_received')
+
+class UserStats(db.Model):
+    """Per-user counters for the profile pages, one row per user.
+    
+    SQLite triggers keep the counters in step with every write to books,
+    borrowing_history and users (creating and deleting books, approving and
+    returning loans, upvotes and the upvote queue flush), so a profile reads
+    them with one primary-key lookup. Hidden books count towards none of the
+    book counters, so a profile shows only what the public catalog does.
+    `flask users reconcile-stats` rebuilds them from the source tables.
+    """
+    __tablename__ = 'user_stats'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    books_owned = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    books_lent_out = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Owned books on loan right now
+    books_borrowed = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Loans taken, ever
+    upvotes_received = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Sum of owned books' upvote_count
+    
+    def __repr__(self):
+        return f'<UserStats {self.user_id}>'
+    
+    @classmethod
+    def for_user(cls, user_id):
+        """Return a dict of the user's counters, all zero if they have none yet."""
+        row = db.session.execute(
+            db.select(*[getattr(cls, name) for name in STAT_COLUMNS]).where(cls.user_id == user_id)
+        ).first()
+        return dict(zip(STAT_COLUMNS, row or (0,) * len(STAT_COLUMNS)))
+
+def _add(user, op, book):
+    """UPDATE adding (op '+') or removing (op '-') one visible book's contribution to its owner's counters."""
+    return (
+        f"UPDATE user_stats SET books_owned = books_owned {op} 1, "
+        f"books_lent_out = books_lent_out {op} ({book}.current_borrower_id IS NOT NULL), "
+        f"upvotes_received = upvotes_received {op} {book}.upvote_count "
+        f"WHERE user_id = {user} AND NOT {book}.is_hidden;"
+    )
+
+# Idempotent so they can be re-run against an existing database
+USER_STATS_DDL = (
+    """CREATE TRIGGER IF NOT EXISTS user_stats_users_ai AFTER INSERT ON users BEGIN
+        INSERT OR IGNORE INTO user_stats (user_id) VALUES (new.user_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS user_stats_users_ad AFTER DELETE ON users BEGIN
+        DELETE FROM user_stats WHERE user_id = old.user_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS user_stats_books_ai AFTER INSERT ON books BEGIN
+        {_add('new.owner_id', '+', 'new')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS user_stats_books_ad AFTER DELETE ON books BEGIN
+        {_add('old.owner_id', '-', 'old')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS user_stats_books_au AFTER UPDATE OF owner_id, current_borrower_id, upvote_count, is_hidden ON books
+    WHEN old.owner_id IS NOT new.owner_id
+        OR (old.current_borrower_id IS NULL) != (new.current_borrower_id IS NULL)
+        OR old.upvote_count != new.upvote_count
+        OR old.is_hidden != new.is_hidden
+    BEGIN
+        {_add('old.owner_id', '-', 'old')}
+        {_add('new.owner_id', '+', 'new')}
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS user_stats_history_ai AFTER INSERT ON borrowing_history BEGIN
+        UPDATE user_stats SET books_borrowed = books_borrowed + 1 WHERE user_id = new.borrower_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS user_stats_history_ad AFTER DELETE ON borrowing_history BEGIN
+        UPDATE user_stats SET books_borrowed = books_borrowed - 1 WHERE user_id = old.borrower_id;
+    END""",
+)
+
+# The triggers reference users, books and borrowing_history, so install them once every table exists
+for statement in USER_STATS_DDL:
+    event.listen(db.metadata, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+
+def actual_user_stats():
+    """Select (user_id, *STAT_COLUMNS) for every user, counted from the source tables."""
+    from src.models.book import Book
+    from src.models.borrowing_history import BorrowingHistory
+    from src.models.user import User
+    
+    owned = (
+        db.select(
+            Book.owner_id,
+            db.func.count().label('books_owned'),
+            db.func.count(Book.current_borrower_id).label('books_lent_out'),
+            db.func.sum(Book.upvote_count).label('upvotes_received')
+        )
+        .where(Book.is_hidden == False)
+        .group_by(Book.owner_id)
+        .subquery()
+    )
+    borrowed = (
+        db.select(BorrowingHistory.borrower_id, db.func.count().label('books_borrowed'))
+        .group_by(BorrowingHistory.borrower_id)
+        .subquery()
+    )
+    return (
+        db.select(
+            User.user_id,
+            db.func.coalesce(owned.c.books_owned, 0).label('books_owned'),
+            db.func.coalesce(owned.c.books_lent_out, 0).label('books_lent_out'),
+            db.func.coalesce(borrowed.c.books_borrowed, 0).label('books_borrowed'),
+            db.func.coalesce(owned.c.upvotes_received, 0).label('upvotes_received')
+        )
+        .outerjoin(owned, owned.c.owner_id == User.user_id)
+        .outerjoin(borrowed, borrowed.c.borrower_id == User.user_id)
+    )
@@ -0,0 +1,92 @@
+"""
+Keyset (cursor) pagination for the book sharing application.
+
+Pages are addressed by opaque cursors that encode the sort key of the first
+or last row shown, so fetching page N costs the same index seek as page 1
+instead of a COUNT plus an ever-growing OFFSET scan.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from sqlalchemy import literal, tuple_
+
+class KeysetPage:
+    """One page of results plus the cursors for the pages around it."""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+def encode_cursor(values):
+    """Turn a tuple of sort-key values into a URL-safe token."""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(token, columns):
+    """Parse a token from encode_cursor, returning None if it is malformed."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(values, list) or len(values) != len(columns):
+            return None
+        return tuple(
+            datetime.fromisoformat(value) if column.type.python_type is datetime else column.type.python_type(value)
+            for column, value in zip(columns, values)
+        )
+    except (ValueError, TypeError, binascii.Error):
+        return None
+
+def keyset_paginate(query, columns, per_page, after=None, before=None):
+    """
+    Return a KeysetPage of query ordered by columns, newest first.
+
+    `after` continues past the last row of a previous page, `before` walks back
+    from the first row of a later one. Neither (or an invalid cursor) gives the
+    first page. columns must end in a unique column so the key is total.
+    """
+    key = tuple_(*columns)
+
+    def cursor_for(item):
+        return encode_cursor([getattr(item, column.key) for column in columns])
+
+    def bound(values):
+        return tuple_(*[literal(value, column.type) for column, value in zip(columns, values)])
+
+    before_values = decode_cursor(before, columns) if before else None
+    if before_values:
+        # Walk backwards in ascending order, then flip the page into display order
+        rows = query.filter(key > bound(before_values)).order_by(
+            *[column.asc() for column in columns]
+        ).limit(per_page + 1).all()
+        if rows:
+            has_prev = len(rows) > per_page
+            items = rows[:per_page][::-1]
+            return KeysetPage(
+                items,
+                next_cursor=cursor_for(items[-1]),
+                prev_cursor=cursor_for(items[0]) if has_prev else None
+            )
+
+    after_values = decode_cursor(after, columns) if after else None
+    if after_values:
+        query = query.filter(key < bound(after_values))
+
+    rows = query.order_by(*[column.desc() for column in columns]).limit(per_page + 1).all()
+    items = rows[:per_page]
+    has_next = len(rows) > per_page
+    return KeysetPage(
+        items,
+        next_cursor=cursor_for(items[-1]) if has_next else None,
+        prev_cursor=cursor_for(items[0]) if after_values and items else None
+    )
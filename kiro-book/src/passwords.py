@@ -0,0 +1,123 @@
+"""
+Password hashing for the book sharing application.
+
+Hashing and checking a password is deliberately slow CPU work (scrypt or
+PBKDF2). Under a gevent worker it would freeze every other request in the
+worker, so during requests it runs on a small per-worker process pool and
+only the calling greenlet waits. CLI commands and startup code hash inline.
+
+Instance config:
+
+    PASSWORD_HASH_METHOD   werkzeug method, default 'scrypt:32768:8:1'
+    PASSWORD_SALT_LENGTH   default 16
+    PASSWORD_HASH_WORKERS  pool size, default 2; 0 hashes in the request
+
+Hashes made with other parameters keep working and are re-hashed with the
+current ones the next time their owner logs in.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app, has_app_context, has_request_context
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+def canonical_method(method):
+    """Spell out werkzeug's defaults so a method compares equal to the prefix of its hashes."""
+    name, *params = method.split(':')
+    if name == 'scrypt':
+        defaults = [str(2 ** 15), '8', '1']
+    elif name == 'pbkdf2':
+        defaults = ['sha256', str(DEFAULT_PBKDF2_ITERATIONS)]
+    else:
+        return method
+    return ':'.join([name, *params, *defaults[len(params):]])
+
+def _exit_with_parent(parent_pid):
+    """Pool initializer: end this hashing process once the worker that owns it is gone.
+
+    A worker killed by gunicorn's timeout never shuts its pool down, and the
+    children would otherwise wait on the task pipe forever. The watcher runs
+    on a native thread because the task pipe read would starve a greenlet.
+    """
+    try:
+        from gevent.monkey import get_original
+        start_thread, sleep = get_original('_thread', 'start_new_thread'), get_original('time', 'sleep')
+    except ImportError:
+        from _thread import start_new_thread as start_thread
+        sleep = time.sleep
+
+    def watch():
+        while os.getppid() == parent_pid:
+            sleep(1)
+        os._exit(0)
+    start_thread(watch, ())
+
+class PasswordHasher:
+    """Hashes and verifies passwords, on a process pool while serving requests."""
+
+    def __init__(self, method=DEFAULT_METHOD, salt_length=16, workers=2):
+        self.method = canonical_method(method)
+        self.salt_length = salt_length
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True if pwhash was made with a different method or parameters than configured."""
+        return pwhash.split('$', 1)[0] != self.method
+
+    def _run(self, function, *args):
+        if self.workers <= 0 or not has_request_context():
+            return function(*args)
+        return self._executor().submit(function, *args).result()
+
+    def _executor(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                # One pool per worker process, started on first use
+                if self._pid != os.getpid():
+                    # Forked children only run hash functions and leave through os._exit,
+                    # so they never touch the worker's database connections; spawn would
+                    # re-import the main script (run.py builds the app) in every child
+                    self._pool = ProcessPoolExecutor(
+                        self.workers,
+                        mp_context=multiprocessing.get_context('fork'),
+                        initializer=_exit_with_parent,
+                        initargs=(os.getpid(),)
+                    )
+                    self._pid = os.getpid()
+        return self._pool
+
+    def shutdown(self):
+        """Stop this worker's hashing processes, if it started any."""
+        if self._pool is not None and self._pid == os.getpid():
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+            self._pid = None
+
+_inline_hasher = PasswordHasher(workers=0)
+
+def password_hasher():
+    """The app's PasswordHasher, or an inline one with default settings outside an app."""
+    if has_app_context():
+        return current_app.extensions.get('password_hasher', _inline_hasher)
+    return _inline_hasher
+
+def init_password_hasher(app):
+    app.extensions['password_hasher'] = PasswordHasher(
+        method=app.config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD),
+        salt_length=app.config.get('PASSWORD_SALT_LENGTH', 16),
+        workers=app.config.get('PASSWORD_HASH_WORKERS', 2)
+    )
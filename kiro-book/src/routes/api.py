@@ -0,0 +1,139 @@
+"""
+JSON API routes for the book sharing application.
+
+Version 1 serves the public catalog to scripts and other clients.
+Books are read as plain column rows (no ORM objects) and only the columns a
+client asks for with ?fields= are selected, so a listing costs one indexed
+query and a dict per row:
+
+    GET /api/v1/books?fields=title,author,upvote_count&limit=50
+    GET /api/v1/books?after=<next_cursor>
+    GET /api/v1/books?ids=3,1,2
+    GET /api/v1/books/<id>
+
+Hidden books are never returned. Errors are JSON too, e.g.
+{"error": "Unknown field(s): colour"} with status 400.
+"""
+import json
+from datetime import datetime
+
+from flask import Blueprint, abort, current_app, request
+
+from src.conditional import conditional_page
+from src.extensions import db
+from src.models import Book, User
+from src.pagination import keyset_paginate
+
+api_bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+# Public name -> column; owner_alias needs the users join, added only when asked for
+FIELDS = {
+    'book_id': Book.book_id,
+    'title': Book.title,
+    'author': Book.author,
+    'isbn': Book.isbn,
+    'purchase_url': Book.purchase_url,
+    'recommendation_rating': Book.recommendation_rating,
+    'is_fiction': Book.is_fiction,
+    'is_available': Book.is_available,
+    'upvote_count': Book.upvote_count,
+    'comment_count': Book.comment_count,
+    'owner_id': Book.owner_id,
+    'owner_alias': User.alias.label('owner_alias'),
+    'created_at': Book.created_at,
+    'updated_at': Book.updated_at,
+}
+
+# Listing order, the same newest-first key the HTML pages use
+SORT_COLUMNS = (Book.created_at, Book.book_id)
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+MAX_IDS = 500
+
+def _error(status, message):
+    response = current_app.response_class(
+        json.dumps({'error': message}), status=status, mimetype='application/json'
+    )
+    abort(response)
+
+def _json(payload):
+    """Compact JSON in the key order the fields were requested."""
+    return current_app.response_class(
+        json.dumps(payload, separators=(',', ':'), default=_encode), mimetype='application/json'
+    )
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+def requested_fields():
+    """The ?fields= names in order, book_id first; every field if none are given."""
+    raw = request.args.get('fields')
+    if not raw:
+        return list(FIELDS)
+    names = ['book_id']
+    for name in (part.strip() for part in raw.split(',')):
+        if name and name not in names:
+            names.append(name)
+    unknown = [name for name in names if name not in FIELDS]
+    if unknown:
+        _error(400, f'Unknown field(s): {", ".join(unknown)}. Available: {", ".join(FIELDS)}')
+    return names
+
+def book_rows_query(names, extra=()):
+    """A query for the named fields (plus extra columns) as plain rows of public books."""
+    columns = [FIELDS[name] for name in names]
+    columns += [column for column in extra if not any(column is selected for selected in columns)]
+    query = db.session.query(*columns).filter(Book.is_hidden == False)
+    if 'owner_alias' in names:
+        query = query.join(User, User.user_id == Book.owner_id)
+    return query
+
+def serialize(rows, names):
+    return [dict(zip(names, row)) for row in rows]
+
+@api_bp.route('/books')
+@conditional_page
+def books():
+    """Page through the catalog newest first, or fetch up to MAX_IDS books with ?ids=."""
+    names = requested_fields()
+    
+    if 'ids' in request.args:
+        try:
+            ids = [int(part) for part in request.args['ids'].split(',') if part.strip()]
+        except ValueError:
+            _error(400, 'ids must be a comma-separated list of book ids')
+        if not ids or len(ids) > MAX_IDS:
+            _error(400, f'ids takes between 1 and {MAX_IDS} book ids')
+        ids = list(dict.fromkeys(ids))
+        rows = book_rows_query(names).filter(Book.book_id.in_(ids)).all()
+        found = {row[0]: row for row in rows}
+        return _json({
+            'books': serialize((found[book_id] for book_id in ids if book_id in found), names),
+            'missing': [book_id for book_id in ids if book_id not in found],
+        })
+    
+    limit = request.args.get('limit', DEFAULT_LIMIT, type=int)
+    if limit < 1 or limit > MAX_LIMIT:
+        _error(400, f'limit must be between 1 and {MAX_LIMIT}')
+    page = keyset_paginate(
+        book_rows_query(names, extra=SORT_COLUMNS), SORT_COLUMNS, limit,
+        after=request.args.get('after'), before=request.args.get('before')
+    )
+    return _json({
+        'books': serialize(page.items, names),
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor,
+    })
+
+@api_bp.route('/books/<int:book_id>')
+@conditional_page
+def book(book_id):
+    """One public book with the requested fields."""
+    names = requested_fields()
+    row = book_rows_query(names).filter(Book.book_id == book_id).first()
+    if row is None:
+        _error(404, 'Book not found')
+    return _json(serialize([row], names)[0])
@@ -7,6 +7,7 @@ from werkzeug.security import generate_password_hash
 
 from src.extensions import db
 from src.models import User, InviteCode
+from src.sqlite_tuning import begin_write
 from src.forms.auth import LoginForm, RegistrationForm
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
@@ -29,6 +30,9 @@ def register():
             flash('Invalid or expired invite code.', 'danger')
             return render_template('auth/register.html', form=form)
         
+        # Finish the read transaction so it doesn't span the slow password hash
+        db.session.rollback()
+        
         # Create new user
         user = User(
             email=form.email.data,
@@ -38,10 +42,12 @@ def register():
         )
         
         # Add user to database and commit to get the user_id
+        begin_write()
         db.session.add(user)
         db.session.commit()
         
         # Now create personal invite code with the user's ID
+        begin_write()
         personal_invite = InviteCode(
             invite_code=user.personal_invite_code,
             creator_id=user.user_id
@@ -80,8 +86,16 @@ def login():
     form = LoginForm()
     if form.validate_on_submit():
         user = User.query.filter_by(email=form.email.data).first()
+        # End the read transaction before the slow password check; user stays loaded
+        db.session.close()
         
         if user and user.check_password(form.password.data):
+            # Upgrade hashes made with older parameters while we have the password
+            if user.password_needs_rehash():
+                user.set_password(form.password.data)
+                db.session.add(user)
+                db.session.commit()
+            
             login_user(user, remember=form.remember.data)
             next_page = request.args.get('next')
             # Use url_for to generate safe URLs and validate the next_page
@@ -1,30 +1,60 @@
 """
 Book management routes for the book sharing application.
 """
-from flask import Blueprint, render_template, redirect, url_for, flash, request, abort
+from flask import Blueprint, render_template, redirect, url_for, flash, request, abort, current_app
 from flask_login import login_required, current_user
-from sqlalchemy import desc
 
 from src.extensions import db, csrf
 from src.models import Book, BookComment, BookUpvote, BorrowRequest, BorrowingHistory
 from src.forms.book import BookForm, CommentForm, BorrowRequestForm
+from src.loading import BOOK_CARDS, BOOK_DETAIL, BOOK_COMMENTS
+from src.pagination import keyset_paginate
+from src.search import search_books
+from src.conditional import conditional_page
+from src.export import FORMATS, catalog_export, export_response
 
 books_bp = Blueprint('books', __name__, url_prefix='/books')
 
+COMMENTS_PER_PAGE = 20
+
 # amazonq-ignore-next-line
 @books_bp.route('/')
+@conditional_page
 def index():
     """Display all books."""
-    page = request.args.get('page', 1, type=int)
     per_page = 10
     
-    # Exclude hidden books from the general book listing
-    books = Book.query.filter_by(is_hidden=False).order_by(desc(Book.created_at)).paginate(
-        page=page, per_page=per_page, error_out=False
+    # Exclude hidden books from the general book listing, newest first
+    books = keyset_paginate(
+        Book.query.options(*BOOK_CARDS).filter_by(is_hidden=False),
+        (Book.created_at, Book.book_id), per_page,
+        after=request.args.get('after'), before=request.args.get('before')
     )
     
     return render_template('books/index.html', books=books)
 
+@books_bp.route('/search')
+def search():
+    """Full-text search over book titles, authors and ISBNs."""
+    query = request.args.get('q', '').strip()
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = 10
+    
+    # Hidden books never appear in results
+    results = search_books(query, page=page, per_page=per_page, options=BOOK_CARDS)
+    
+    return render_template('books/search.html', books=results, query=query)
+
+@books_bp.route('/export')
+@login_required
+def export():
+    """Download the public catalog as CSV, or NDJSON with ?format=ndjson."""
+    file_format = request.args.get('format', 'csv')
+    if file_format not in FORMATS:
+        abort(400)
+    header, rows = catalog_export()
+    return export_response('catalog', file_format, header, rows)
+
 # Import the necessary modules for authorization
 from flask_login import login_required
 from flask import abort
@@ -34,8 +64,8 @@ from flask import abort
 def view(book_id):
     """Display a single book."""
 
-    book = Book.query.get_or_404(book_id)
-    comments = BookComment.query.filter_by(book_id=book_id).order_by(BookComment.created_at).all()
+    book = Book.query.options(*BOOK_DETAIL).get_or_404(book_id)
+    comments = comment_page(book_id, request.args.get('comments_after'))
     comment_form = CommentForm()
     borrow_form = BorrowRequestForm()
     
@@ -63,6 +93,23 @@ def view(book_id):
         pending_request=pending_request
     )
 
+def comment_page(book_id, after=None):
+    """One page of a book's comments, newest first, with their authors joined in."""
+    return keyset_paginate(
+        BookComment.query.options(*BOOK_COMMENTS).filter_by(book_id=book_id),
+        (BookComment.created_at, BookComment.comment_id), COMMENTS_PER_PAGE, after=after
+    )
+
+@books_bp.route('/<int:book_id>/comments')
+@login_required
+def comments(book_id):
+    """Return the next page of comments as rendered HTML for "Load more comments"."""
+    page = comment_page(book_id, request.args.get('after'))
+    return {
+        'html': render_template('books/_comments.html', comments=page.items),
+        'next_cursor': page.next_cursor,
+    }
+
 @books_bp.route('/create', methods=['POST'])
 @login_required
 def create():
@@ -186,13 +233,18 @@ def add_comment(book_id):
 @login_required
 def toggle_upvote(book_id):
     """Toggle upvote for a book."""
-    book = Book.query.get_or_404(book_id)
-    
-    # Toggle the upvote
-    is_upvoted = book.toggle_upvote(current_user.user_id)
+    # Toggle the upvote; the new count comes back from the same statements
+    queue = current_app.extensions.get('upvote_queue')
+    if queue is not None:
+        result = queue.toggle(book_id, current_user.user_id)
+    else:
+        result = Book.toggle_upvote(book_id, current_user.user_id)
+    if result is None:
+        abort(404)
+    is_upvoted, upvote_count = result
     
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        return {'upvoted': is_upvoted, 'count': book.upvote_count}
+        return {'upvoted': is_upvoted, 'count': upvote_count}
     
     return redirect(url_for('books.view', book_id=book_id))
 
@@ -238,44 +290,32 @@ def request_borrow(book_id):
 @login_required
 def approve_request(request_id):
     """Approve a borrow request."""
-    borrow_request = BorrowRequest.query.get_or_404(request_id)
-    book = Book.query.get_or_404(borrow_request.book_id)
+    borrow_request = db.session.execute(
+        db.select(BorrowRequest.book_id, BorrowRequest.requester_id, BorrowRequest.status, Book.owner_id)
+        .join(Book, Book.book_id == BorrowRequest.book_id)
+        .where(BorrowRequest.request_id == request_id)
+    ).first()
+    if borrow_request is None:
+        abort(404)
     
     # Check if current user is the owner of the book
-    if book.owner_id != current_user.user_id:
+    if borrow_request.owner_id != current_user.user_id:
         abort(403)
     
-    # Check if book is still available
-    if not book.is_available:
-        flash('This book is no longer available for borrowing.', 'danger')
+    if borrow_request.status != 'pending':
+        flash('This request has already been answered.', 'warning')
         return redirect(url_for('profile.requests'))
     
-    # Update the book status
-    book.is_available = False
-    book.current_borrower_id = borrow_request.requester_id
-    
-    # Update the request status
-    borrow_request.status = 'approved'
-    
-    # Create a borrowing history record
-    history = BorrowingHistory(
-        book_id=book.book_id,
-        borrower_id=borrow_request.requester_id
-    )
-    db.session.add(history)
-    
-    # Reject all other pending requests for this book
-    other_requests = BorrowRequest.query.filter_by(
-        book_id=book.book_id,
-        status='pending'
-    ).filter(BorrowRequest.request_id != request_id).all()
-    
-    for request in other_requests:
-        request.status = 'rejected'
-    
-    db.session.commit()
+    # Lend the book only if it is still available, rejecting the competing requests
+    rejected = BorrowRequest.approve_and_lend(request_id, borrow_request.book_id, borrow_request.requester_id)
+    if rejected is None:
+        flash('This book is no longer available for borrowing.', 'danger')
+        return redirect(url_for('profile.requests'))
     
-    flash('Borrow request approved successfully!', 'success')
+    message = 'Borrow request approved successfully!'
+    if rejected:
+        message += f' {rejected} other pending request(s) for this book were rejected.'
+    flash(message, 'success')
     return redirect(url_for('profile.requests'))
 
 @books_bp.route('/requests/<int:request_id>/reject', methods=['POST'])
@@ -2,22 +2,24 @@
 Main routes for the book sharing application.
 """
 from flask import Blueprint, render_template, request, current_app
-from sqlalchemy import desc
 
 from src.models import Book
+from src.loading import BOOK_CARDS
+from src.pagination import keyset_paginate
+from src.conditional import conditional_page
 
 main_bp = Blueprint('main', __name__)
 
 @main_bp.route('/')
+@conditional_page
 def index():
     """Display the dashboard with all books and available books."""
-    page = request.args.get('page', 1, type=int)
     view_type = request.args.get('view', 'all')  # Default to all books
     category = request.args.get('category', 'all')  # Default to all categories
     per_page = 10
     
     # Base query - exclude hidden books from all dashboard views
-    base_query = Book.query.filter_by(is_hidden=False)
+    base_query = Book.query.options(*BOOK_CARDS).filter_by(is_hidden=False)
     
     # Apply category filter if specified
     if category == 'fiction':
@@ -25,18 +27,18 @@ def index():
     elif category == 'non-fiction':
         base_query = base_query.filter_by(is_fiction=False)
     
-    # Get books, sorted by creation date (newest first)
     if view_type == 'available':
         # Get only available books
-        books = base_query.filter_by(is_available=True).order_by(desc(Book.created_at)).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        base_query = base_query.filter_by(is_available=True)
         active_tab = 'available'
     else:
         # Get all books (except hidden ones)
-        books = base_query.order_by(desc(Book.created_at)).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
         active_tab = 'all'
     
+    # Newest first, paged by (created_at, book_id) cursors rather than OFFSET
+    books = keyset_paginate(
+        base_query, (Book.created_at, Book.book_id), per_page,
+        after=request.args.get('after'), before=request.args.get('before')
+    )
+    
     return render_template('index.html', books=books, active_tab=active_tab, active_category=category)
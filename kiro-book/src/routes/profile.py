@@ -5,8 +5,15 @@ from flask import Blueprint, render_template, redirect, url_for, flash, request,
 from flask_login import login_required, current_user
 
 from src.extensions import db
-from src.models import User, Book, BorrowRequest, BorrowingHistory
+from src.models import User, Book, BorrowRequest, BorrowingHistory, UserStats
 from src.forms.profile import ProfileForm
+from src.conditional import conditional_page
+from src.export import FORMATS, YIELD_PER, export_response
+from src.pagination import keyset_paginate
+from src.loading import (
+    OWNED_BOOKS, BORROWED_BOOKS, BORROWED_HISTORY, LENT_HISTORY,
+    OUTGOING_REQUESTS, INCOMING_REQUESTS
+)
 
 profile_bp = Blueprint('profile', __name__, url_prefix='/profile')
 
@@ -14,7 +21,8 @@ profile_bp = Blueprint('profile', __name__, url_prefix='/profile')
 @login_required
 def index():
     """Display current user's profile."""
-    return render_template('profile/index.html', user=current_user)
+    return render_template('profile/index.html', user=current_user,
+                          stats=UserStats.for_user(current_user.user_id))
 
 @profile_bp.route('/edit', methods=['POST'])
 @login_required
@@ -23,8 +31,10 @@ def edit():
     form = ProfileForm(obj=current_user)
     
     if form.validate_on_submit():
-        current_user.alias = form.alias.data
-        current_user.bio = form.bio.data
+        # current_user is a cached snapshot; edit the real row (committing evicts the snapshot)
+        user = db.session.get(User, current_user.user_id)
+        user.alias = form.alias.data
+        user.bio = form.bio.data
         
         db.session.commit()
         flash('Profile updated successfully!', 'success')
@@ -43,40 +53,91 @@ def edit_get():
 @login_required
 def books():
     """Display books owned by the current user."""
-    # Using join to eagerly load borrower information
-    user_books = Book.query.filter_by(owner_id=current_user.user_id).all()
+    # Eagerly load borrower information for the status column
+    user_books = Book.query.options(*OWNED_BOOKS).filter_by(owner_id=current_user.user_id).all()
     return render_template('profile/books.html', books=user_books)
 
 @profile_bp.route('/borrowed')
 @login_required
 def borrowed():
     """Display books currently borrowed by the user."""
-    borrowed_books = Book.query.filter_by(current_borrower_id=current_user.user_id).all()
+    borrowed_books = Book.query.options(*BORROWED_BOOKS).filter_by(current_borrower_id=current_user.user_id).all()
     return render_template('profile/borrowed.html', books=borrowed_books)
 
 @profile_bp.route('/history')
 @login_required
 def history():
     """Display borrowing history for the current user - both borrowed and lent books."""
-    # Books the user has borrowed from others
-    borrowed_history = BorrowingHistory.query.filter_by(borrower_id=current_user.user_id).all()
+    per_page = 20
+    active_tab = request.args.get('tab', 'borrowed')
+    if active_tab == 'lent':
+        # Books the user has lent to others (books owned by the user that have been borrowed)
+        query = BorrowingHistory.query.join(Book).options(*LENT_HISTORY).filter(Book.owner_id == current_user.user_id)
+    else:
+        # Books the user has borrowed from others
+        active_tab = 'borrowed'
+        query = BorrowingHistory.query.options(*BORROWED_HISTORY).filter_by(borrower_id=current_user.user_id)
     
-    # Books the user has lent to others (books owned by the user that have been borrowed)
-    lent_history = BorrowingHistory.query.join(Book).filter(Book.owner_id == current_user.user_id).all()
+    records = keyset_paginate(
+        query, (BorrowingHistory.borrow_date, BorrowingHistory.borrow_id), per_page,
+        after=request.args.get('after'), before=request.args.get('before')
+    )
     
-    return render_template('profile/history.html', 
-                          borrowed_history=borrowed_history,
-                          lent_history=lent_history)
+    return render_template('profile/history.html',
+                          records=records,
+                          active_tab=active_tab,
+                          summary=BorrowingHistory.summary_for(current_user.user_id))
+
+@profile_bp.route('/history/export')
+@login_required
+def export_history():
+    """Download the current user's full borrowing history as CSV, or NDJSON with ?format=ndjson."""
+    file_format = request.args.get('format', 'csv')
+    if file_format not in FORMATS:
+        abort(400)
+    user_id = current_user.user_id
+    other_party = db.aliased(User)
+    columns = (Book.title, Book.author, other_party.alias, BorrowingHistory.borrow_date, BorrowingHistory.return_date)
+    order = (BorrowingHistory.borrow_date, BorrowingHistory.borrow_id)
+    
+    borrowed = (
+        db.select(*columns)
+        .join(Book, Book.book_id == BorrowingHistory.book_id)
+        .join(other_party, other_party.user_id == Book.owner_id)
+        .where(BorrowingHistory.borrower_id == user_id)
+        .order_by(*order)
+    )
+    lent = (
+        db.select(*columns)
+        .join(Book, Book.book_id == BorrowingHistory.book_id)
+        .join(other_party, other_party.user_id == BorrowingHistory.borrower_id)
+        .where(Book.owner_id == user_id)
+        .order_by(*order)
+    )
+    
+    def rows():
+        for direction, statement in (('borrowed', borrowed), ('lent', lent)):
+            for title, author, alias, borrow_date, return_date in db.session.execute(
+                statement.execution_options(yield_per=YIELD_PER)
+            ):
+                yield (direction, title, author, alias, borrow_date.isoformat(),
+                       return_date.isoformat() if return_date else None)
+    
+    return export_response(
+        'borrowing-history', file_format,
+        ('direction', 'title', 'author', 'other_user', 'borrow_date', 'return_date'),
+        rows()
+    )
 
 @profile_bp.route('/requests')
 @login_required
 def requests():
     """Display borrow requests made by and to the current user."""
     # Requests made by the current user
-    outgoing_requests = BorrowRequest.query.filter_by(requester_id=current_user.user_id).all()
+    outgoing_requests = BorrowRequest.query.options(*OUTGOING_REQUESTS).filter_by(requester_id=current_user.user_id).all()
     
     # Requests for books owned by the current user
-    incoming_requests = BorrowRequest.query.join(Book).filter(
+    incoming_requests = BorrowRequest.query.join(Book).options(*INCOMING_REQUESTS).filter(
         Book.owner_id == current_user.user_id,
         BorrowRequest.status == 'pending'
     ).all()
@@ -92,6 +153,7 @@ def invite():
     return render_template('profile/invite.html', invite_code=current_user.personal_invite_code)
 
 @profile_bp.route('/<int:user_id>')
+@conditional_page
 def view(user_id):
     """View another user's profile."""
     user = User.query.get_or_404(user_id)
@@ -99,4 +161,5 @@ def view(user_id):
     # Get public books owned by this user
     public_books = Book.query.filter_by(owner_id=user_id, is_available=True).all()
     
-    return render_template('profile/view.html', user=user, books=public_books)
\ No newline at end of file
+    return render_template('profile/view.html', user=user, books=public_books,
+                          stats=UserStats.for_user(user_id))
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""
+Full-text book search for the book sharing application.
+
+Queries run against the books_fts FTS5 index defined next to the Book model
+and are ranked by BM25, best match first. Every public match is ranked, so a
+page deep into a broad query still shows the next best books rather than
+only the newest ones. Prefixes shorter than three characters are matched as
+whole words, which keeps broad queries from matching most of the catalog.
+"""
+import re
+
+from sqlalchemy import column, func, literal_column, table, text
+
+from src.extensions import db
+from src.models import Book
+from src.models.book import BOOKS_FTS_DDL
+
+books_fts = table('books_fts', column('rowid'))
+
+class SearchPage:
+    """One page of search results."""
+
+    def __init__(self, items, page, has_next):
+        self.items = items
+        self.page = page
+        self.has_next = has_next
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+    @property
+    def prev_num(self):
+        return self.page - 1
+
+    @property
+    def next_num(self):
+        return self.page + 1
+
+def build_match_query(terms):
+    """
+    Turn free text into an FTS5 MATCH expression.
+
+    Each word is quoted so user input can't inject FTS5 syntax, and the last
+    word is a prefix match so partial titles still find the book. Prefixes
+    shorter than three characters match too many terms to be useful.
+    """
+    words = re.findall(r'\w+', terms)
+    if not words:
+        return None
+    quoted = [f'"{word}"' for word in words]
+    if len(words[-1]) >= 3:
+        quoted[-1] += '*'
+    return ' '.join(quoted)
+
+def search_books(terms, page=1, per_page=10, options=()):
+    """Return a SearchPage of public books matching terms, ranked by BM25."""
+    match = build_match_query(terms)
+    if match is None:
+        return SearchPage([], page, False)
+
+    # Hidden books are filtered out before ranking, so they never take up a page slot
+    fts = literal_column('books_fts')
+    matches = (
+        db.select(books_fts.c.rowid.label('book_id'), func.bm25(fts).label('score'))
+        .select_from(books_fts)
+        .where(fts.match(match))
+        .subquery()
+    )
+    rows = (
+        Book.query.options(*options)
+        .join(matches, matches.c.book_id == Book.book_id)
+        .filter(Book.is_hidden == False)
+        .order_by(matches.c.score, Book.book_id.desc())
+        .offset((page - 1) * per_page)
+        .limit(per_page + 1)
+        .all()
+    )
+    return SearchPage(rows[:per_page], page, len(rows) > per_page)
+
+def rebuild_search_index():
+    """Create the FTS table and triggers if missing, then reindex every book."""
+    for statement in BOOKS_FTS_DDL:
+        db.session.execute(text(statement))
+    db.session.execute(text("INSERT INTO books_fts(books_fts) VALUES ('rebuild')"))
+    db.session.execute(text("INSERT INTO books_fts(books_fts) VALUES ('optimize')"))
+    db.session.commit()
+    return db.session.scalar(text('SELECT COUNT(*) FROM books_fts'))
@@ -0,0 +1,103 @@
+"""
+SQLite engine tuning for the book sharing application.
+
+Every gunicorn worker opens its own connections to the same database file.
+SQLite's defaults (rollback journal, full fsync, a 2 MB page cache) make
+readers and writers block each other, so every new connection gets the
+pragmas below. Read-only requests (GET, HEAD, OPTIONS) start their
+transactions with a plain BEGIN, so each page reads one consistent snapshot
+without blocking writers. Every other request, and CLI commands and startup
+code, keep pysqlite's usual handling: reads run outside a transaction and
+BEGIN is issued just before the first write, so a write never lands on a
+stale snapshot.
+
+Code whose writes depend on what it read in the same transaction calls
+begin_write() first. It starts the next transaction with BEGIN IMMEDIATE,
+queueing for the write lock (within busy_timeout) before the reads, so no
+other connection can commit in between. The lock is held until commit, so nothing slow (password
+hashing in particular) should run between begin_write() and the commit.
+
+Override any pragma per environment with SQLITE_PRAGMAS in the instance
+config, e.g. ``SQLITE_PRAGMAS = {'busy_timeout': 15000}``; a value of None
+leaves SQLite's default in place.
+"""
+from flask import has_request_context, request
+from sqlalchemy import event
+
+from src.extensions import db
+
+DEFAULT_PRAGMAS = {
+    # Readers keep reading while a writer commits
+    'journal_mode': 'WAL',
+    # Safe with WAL: a power loss can drop the last commits but never corrupts the file
+    'synchronous': 'NORMAL',
+    # Milliseconds to wait for the write lock before giving up
+    'busy_timeout': 5000,
+    # Negative values are KiB, so 64 MB of page cache per connection
+    'cache_size': -64000,
+    # Read pages through a 256 MB memory map instead of read() calls
+    'mmap_size': 268435456,
+    # Sorts and temporary indexes stay in memory
+    'temp_store': 'MEMORY',
+}
+
+# Requests with these methods only read, so they get one snapshot per transaction
+READ_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+
+# Connection execution option set by begin_write()
+WRITE_LOCK = 'sqlite_write_lock'
+
+def engine_pragmas(app):
+    """The pragmas to apply to new connections, with instance overrides merged in."""
+    pragmas = dict(DEFAULT_PRAGMAS)
+    pragmas.update(app.config.get('SQLITE_PRAGMAS') or {})
+    return {name: value for name, value in pragmas.items() if value is not None}
+
+def init_sqlite_tuning(app):
+    """Apply the engine profile to the app's SQLite engine."""
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = engine_pragmas(app)
+    immediate_writes = app.config.get('SQLITE_IMMEDIATE_WRITES', True)
+
+    @event.listens_for(engine, 'connect')
+    def configure_connection(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+
+    if immediate_writes:
+        @event.listens_for(engine, 'begin')
+        def begin_transaction(connection):
+            dbapi_connection = connection.connection.driver_connection
+            write_lock = connection.get_execution_options().get(WRITE_LOCK, False)
+            snapshot = has_request_context() and request.method in READ_METHODS
+            if not (write_lock or snapshot):
+                # pysqlite's default: BEGIN DEFERRED just before the first write
+                dbapi_connection.isolation_level = ''
+                return
+            # Take over from pysqlite and start the transaction ourselves
+            dbapi_connection.isolation_level = None
+            if write_lock:
+                # Queue for the write lock now, while busy_timeout still applies
+                connection.exec_driver_sql('BEGIN IMMEDIATE')
+            else:
+                connection.exec_driver_sql('BEGIN')
+
+def begin_write():
+    """
+    Start the session's next transaction with BEGIN IMMEDIATE on SQLite.
+    
+    Any transaction already open is committed first. Call this right before
+    a read-then-write sequence, after any slow work, and commit promptly.
+    Other databases (and SQLITE_IMMEDIATE_WRITES = False) just get a new
+    transaction.
+    """
+    session = db.session()
+    if session.in_transaction():
+        session.commit()
+    session.connection(execution_options={WRITE_LOCK: True})
@@ -0,0 +1,146 @@
+"""
+Fingerprinted static assets for the book sharing application.
+
+`flask assets build` copies every file under the static folder to
+static/build/ with a content hash in its name (css/style.css becomes
+build/css/style.1a2b3c4d5e6f.css), writes gzip and, when the optional brotli
+package is installed, brotli variants of text files next to each copy, and
+records the mapping in build/manifest.json.
+
+Templates link assets with asset_url_for(), a drop-in for url_for that
+swaps in the fingerprinted name when the manifest has one. Because the name
+changes whenever the content does, fingerprinted files are served with a
+one-year immutable Cache-Control, and the static view sends the smallest
+precompressed variant the client's Accept-Encoding allows. Without a build,
+asset_url_for() and the static view behave exactly like Flask's own.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+
+from flask import current_app, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # optional: gzip variants only
+    brotli = None
+
+BUILD_DIR = 'build'
+MANIFEST = 'manifest.json'
+
+# File types worth precompressing; images and fonts are compressed already
+COMPRESSIBLE = {'.css', '.js', '.svg', '.json', '.txt', '.html', '.xml', '.map'}
+
+# Preferred first when the client accepts both
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+ONE_YEAR = 365 * 24 * 60 * 60
+
+def fingerprint(path, data):
+    """css/style.css -> css/style.<first 12 hex digits of sha256>.css"""
+    stem, extension = os.path.splitext(path)
+    return f'{stem}.{hashlib.sha256(data).hexdigest()[:12]}{extension}'
+
+def _compressed_variants(data):
+    variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data, quality=11)
+    return variants
+
+def build_assets(static_folder):
+    """
+    Fingerprint the files in static_folder into static_folder/build; return the manifest.
+    
+    Copies from earlier builds are left in place, so a page cached before a
+    deploy (or revalidated with a 304) still finds the assets it links.
+    """
+    output = os.path.join(static_folder, BUILD_DIR)
+    os.makedirs(output, exist_ok=True)
+    
+    manifest = {}
+    for root, dirs, files in os.walk(static_folder):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.') and os.path.join(root, d) != output)
+        for name in sorted(files):
+            if name.startswith('.'):
+                continue
+            source = os.path.join(root, name)
+            logical = os.path.relpath(source, static_folder).replace(os.sep, '/')
+            with open(source, 'rb') as file:
+                data = file.read()
+            built = fingerprint(logical, data)
+            target = os.path.join(output, built)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as file:
+                file.write(data)
+            
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE:
+                for suffix, compressed in _compressed_variants(data).items():
+                    # Only keep variants that actually save bytes
+                    if len(compressed) < len(data):
+                        with open(target + suffix, 'wb') as file:
+                            file.write(compressed)
+            manifest[logical] = f'{BUILD_DIR}/{built}'
+    
+    with open(os.path.join(output, MANIFEST), 'w') as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    # Build output is regenerated on deploy, never committed
+    with open(os.path.join(output, '.gitignore'), 'w') as file:
+        file.write('*\n')
+    return manifest
+
+class StaticAssets:
+    """The manifest and the precompressed variants found at startup."""
+    
+    def __init__(self, static_folder):
+        self.static_folder = static_folder
+        self.manifest = {}
+        self.variants = {}
+        path = os.path.join(static_folder, BUILD_DIR, MANIFEST)
+        if os.path.exists(path):
+            with open(path) as file:
+                self.manifest = json.load(file)
+        for built in self.manifest.values():
+            self.variants[built] = tuple(
+                (encoding, suffix) for encoding, suffix in ENCODINGS
+                if os.path.exists(os.path.join(static_folder, built + suffix))
+            )
+    
+    def serve(self, filename):
+        """Response for the static route: fingerprinted files get long caching and compression."""
+        variants = self.variants.get(filename)
+        if variants is None:
+            return current_app.send_static_file(filename)
+        
+        encoding = suffix = None
+        for candidate, candidate_suffix in variants:
+            if request.accept_encodings[candidate]:
+                encoding, suffix = candidate, candidate_suffix
+                break
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_from_directory(self.static_folder, filename + (suffix or ''), mimetype=mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if variants:
+            response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.max_age = ONE_YEAR
+        response.cache_control.immutable = True
+        response.cache_control.no_cache = None
+        return response
+
+def asset_url_for(endpoint, **values):
+    """url_for that links the fingerprinted copy of a static file once assets are built."""
+    if endpoint == 'static' and 'filename' in values:
+        assets = current_app.extensions.get('static_assets')
+        if assets is not None:
+            values['filename'] = assets.manifest.get(values['filename'], values['filename'])
+    return url_for(endpoint, **values)
+
+def init_static_assets(app):
+    """Serve fingerprinted static files built by `flask assets build`, if there are any."""
+    assets = StaticAssets(app.static_folder)
+    app.extensions['static_assets'] = assets
+    app.jinja_env.globals['asset_url_for'] = asset_url_for
+    app.view_functions['static'] = assets.serve
@@ -0,0 +1,47 @@
+"""
+Template bytecode cache for the book sharing application.
+
+Jinja compiles a template to Python the first time a process renders it, so
+every freshly forked or recycled gunicorn worker pays that cost again on its
+first requests. With TEMPLATE_BYTECODE_CACHE set in the instance config, the
+compiled code is kept in instance/jinja-cache (or the directory the setting
+names) and shared by all workers: the first process to compile a template
+writes it, the rest load it. `flask templates compile` fills the cache at
+deploy time so no worker compiles anything. Entries are keyed by template
+source checksum and Python version, so edited templates are recompiled
+automatically.
+"""
+import os
+
+from jinja2 import FileSystemBytecodeCache
+
+DEFAULT_DIRECTORY = 'jinja-cache'
+
+def cache_directory(app):
+    """Where the bytecode cache lives, or None if TEMPLATE_BYTECODE_CACHE is off."""
+    setting = app.config.get('TEMPLATE_BYTECODE_CACHE', False)
+    if not setting:
+        return None
+    if isinstance(setting, str):
+        return setting
+    return os.path.join(app.instance_path, DEFAULT_DIRECTORY)
+
+def init_template_cache(app):
+    """Share compiled templates between workers through a directory when enabled."""
+    directory = cache_directory(app)
+    if directory is None:
+        return
+    os.makedirs(directory, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+def compile_templates(app):
+    """Compile every template into the bytecode cache, replacing old entries; return the names."""
+    environment = app.jinja_env
+    environment.bytecode_cache.clear()
+    # Skip the in-memory template cache so each template is really loaded
+    if environment.cache is not None:
+        environment.cache.clear()
+    names = environment.list_templates()
+    for name in names:
+        environment.get_template(name)
+    return names
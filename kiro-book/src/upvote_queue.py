@@ -0,0 +1,71 @@
+"""
+Write-coalescing upvote queue for the book sharing application.
+
+With UPVOTE_QUEUE = True in the instance config, an upvote click only appends
+a row to the upvote_journal table: a short single-row commit that doesn't
+touch book_upvotes, the books counter or the triggers behind search and
+conditional GET. A flusher in each worker wakes UPVOTE_FLUSH_INTERVAL_MS
+(default 200) after the first pending click and applies the journal in
+batched transactions, folding repeated toggles by the same user. The journal
+survives restarts; any worker's flusher, or `flask books flush-upvotes`,
+applies entries left behind by another.
+"""
+import os
+import threading
+import time
+
+from src.models import UpvoteJournal
+
+class UpvoteQueue:
+    """Journals upvote toggles and applies them from a background flusher."""
+
+    def __init__(self, app, interval_ms=200, batch_size=1000):
+        self.app = app
+        self.interval = interval_ms / 1000
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._wake = None
+        self._pid = None
+
+    def toggle(self, book_id, user_id):
+        """Queue a toggle; returns (upvoted, upvote_count) including pending toggles, or None."""
+        result = UpvoteJournal.record_toggle(book_id, user_id)
+        if result is not None:
+            self._wake_flusher()
+        return result
+
+    def flush(self):
+        """Apply every pending journal entry now; returns how many were consumed."""
+        total = 0
+        while True:
+            applied = UpvoteJournal.flush(self.batch_size)
+            total += applied
+            if applied < self.batch_size:
+                return total
+
+    def _wake_flusher(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                # Started lazily so each (possibly forked, possibly gevent-patched) worker gets its own
+                if self._pid != os.getpid():
+                    self._wake = threading.Event()
+                    threading.Thread(target=self._run, name='upvote-flusher', daemon=True).start()
+                    self._pid = os.getpid()
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            # Let a burst of clicks accumulate, then apply them together
+            time.sleep(self.interval)
+            self._wake.clear()
+            try:
+                with self.app.app_context():
+                    self.flush()
+            except Exception:
+                self.app.logger.exception('Applying queued upvotes failed; they stay journaled')
+
+def init_upvote_queue(app):
+    """Enable the upvote queue when UPVOTE_QUEUE is set."""
+    if app.config.get('UPVOTE_QUEUE', False):
+        app.extensions['upvote_queue'] = UpvoteQueue(app, app.config.get('UPVOTE_FLUSH_INTERVAL_MS', 200))
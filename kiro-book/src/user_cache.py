@@ -0,0 +1,95 @@
+"""
+Logged-in user cache for the book sharing application.
+
+Flask-Login calls the user loader on every authenticated request. Instead of
+an ORM User, the loader returns a UserIdentity: a plain snapshot of the
+columns pages read from current_user, kept per worker in a bounded TTL cache.
+Being a plain object it can't lazy load or be attached to a session, so it
+is safe in templates long after the request that loaded it.
+
+Commits that change a user's identity columns evict that user in the
+committing worker right away; other workers pick the change up within
+USER_CACHE_TTL seconds (default 60, 0 disables the cache).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from flask_login import UserMixin
+
+# Columns copied onto UserIdentity; changes to any of them evict the cache entry
+IDENTITY_COLUMNS = (
+    'user_id', 'email', 'alias', 'bio', 'registration_date',
+    'personal_invite_code', 'invites_used_count', 'is_active',
+)
+
+class UserIdentity(UserMixin):
+    """A read-only snapshot of a user's identity columns, used as current_user."""
+
+    def __init__(self, **columns):
+        for name in IDENTITY_COLUMNS:
+            setattr(self, '_active' if name == 'is_active' else name, columns[name])
+
+    @property
+    def is_active(self):
+        return self._active
+
+    def get_id(self):
+        return str(self.user_id)
+
+    def __repr__(self):
+        return f'<UserIdentity {self.email}>'
+
+class UserCache:
+    """A bounded, thread-safe LRU of UserIdentity objects that expire after ttl seconds."""
+
+    def __init__(self, ttl=60, maxsize=10000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, user_id, identity):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, identity)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0,
+        }
+
+def init_user_cache(app):
+    """Create the per-worker user cache; USER_CACHE_TTL = 0 disables it."""
+    app.extensions['user_cache'] = UserCache(
+        ttl=app.config.get('USER_CACHE_TTL', 60),
+        maxsize=app.config.get('USER_CACHE_SIZE', 10000)
+    )